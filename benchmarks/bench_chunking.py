@@ -0,0 +1,63 @@
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.model_registry import get_spacy_nlp
+from services.text_chunking_service import feedback_chunking, split_segments, split_doc
+
+CORPUS_PATH = Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "feedback_corpus.txt"
+
+
+def make_dataset(rows: int) -> list[str]:
+    corpus = CORPUS_PATH.read_text(encoding="utf-8").splitlines()
+    rng = random.Random(42)
+    return [" ".join(rng.sample(corpus, rng.randint(1, 3))) for _ in range(rows)]
+
+
+def sequential_chunking(feedback_list: list[str]):
+    nlp = get_spacy_nlp()
+    lst = []
+    number_list = []
+
+    for feedback in feedback_list:
+        text_chunks = []
+        for seg in split_segments(feedback):
+            text_chunks.extend(split_doc(nlp(seg)))
+        lst.extend(text_chunks)
+        number_list.append(len(text_chunks))
+
+    return lst, number_list
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark feedback_chunking against one-document-at-a-time spaCy calls.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 5000, 15000])
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--n-process", type=int, default=1)
+    args = parser.parse_args()
+
+    get_spacy_nlp()
+
+    for rows in args.rows:
+        feedback_list = make_dataset(rows)
+
+        started = time.perf_counter()
+        expected = sequential_chunking(feedback_list)
+        sequential_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        result = feedback_chunking(feedback_list, batch_size=args.batch_size, n_process=args.n_process)
+        batched_time = time.perf_counter() - started
+
+        print(
+            f"rows={rows:>6} sequential={sequential_time:8.2f}s batched={batched_time:8.2f}s "
+            f"speedup={sequential_time / batched_time:5.2f}x parity={result == expected}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+from sklearn.datasets import make_blobs
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.k_selection_service import select_k, exhaustive_k_sweep
+
+DATASETS = [
+    ("blobs-2k-8", dict(n_samples=2000, centers=8, cluster_std=1.5, random_state=1)),
+    ("blobs-5k-14", dict(n_samples=5000, centers=14, cluster_std=2.0, random_state=2)),
+    ("blobs-10k-20", dict(n_samples=10000, centers=20, cluster_std=2.5, random_state=3)),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare sampled k-selection against the exhaustive KMeans sweep.")
+    parser.add_argument("--sample-size", type=int, default=2000)
+    parser.add_argument("--n-jobs", type=int, default=-1)
+    parser.add_argument("--skip-exhaustive", action="store_true", help="Only time the sampled engines.")
+    args = parser.parse_args()
+
+    for name, params in DATASETS:
+        points, _ = make_blobs(n_features=2, **params)
+        lines = []
+
+        if not args.skip_exhaustive:
+            started = time.perf_counter()
+            expected = exhaustive_k_sweep(points)
+            lines.append(f"{name:<14} exhaustive  k={expected.best_k:<3} {time.perf_counter() - started:7.1f}s")
+
+        for label, n_jobs in (("warm-start", 1), ("parallel", args.n_jobs)):
+            started = time.perf_counter()
+            result = select_k(points, sample_size=args.sample_size, n_jobs=n_jobs)
+            line = f"{name:<14} {label:<11} k={result.best_k:<3} {time.perf_counter() - started:7.1f}s"
+            if not args.skip_exhaustive:
+                score_gap = expected.scores[expected.best_k]["score"] - expected.scores[result.best_k]["score"]
+                line += f" |dk|={abs(result.best_k - expected.best_k)} score gap={score_gap:.4f}"
+            lines.append(line)
+
+        print("\n".join(lines))
+
+
+if __name__ == "__main__":
+    main()
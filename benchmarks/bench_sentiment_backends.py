@@ -0,0 +1,52 @@
+import argparse
+import csv
+import sys
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.model_registry import _load_sentiment_model
+from services.nlp_service import predict_sentiment
+
+SAMPLE_PATH = Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "sentiment_sample.csv"
+
+
+def load_sample() -> tuple[list[str], list[str]]:
+    with open(SAMPLE_PATH, encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    return [row["text"] for row in rows], [row["label"] for row in rows]
+
+
+def run_backend(backend: str, texts: list[str], repeat: int) -> tuple[list[str], float]:
+    tokenizer, model = _load_sentiment_model(backend)
+    with patch("services.nlp_service.get_sentiment_model", return_value=(tokenizer, model)):
+        predict_sentiment(texts[:2])
+        workload = texts * repeat
+        started = time.perf_counter()
+        predictions = predict_sentiment(workload)
+        elapsed = time.perf_counter() - started
+    return predictions[: len(texts)], len(workload) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare torch and quantized ONNX sentiment backends.")
+    parser.add_argument("--repeat", type=int, default=50, help="Times the labelled sample is repeated for throughput.")
+    args = parser.parse_args()
+
+    texts, labels = load_sample()
+    predictions = {}
+    accuracy = {}
+
+    for backend in ("torch", "onnx"):
+        predictions[backend], throughput = run_backend(backend, texts, args.repeat)
+        accuracy[backend] = sum(p == l for p, l in zip(predictions[backend], labels)) / len(labels)
+        print(f"backend={backend:<6} throughput={throughput:8.1f} chunks/sec accuracy={accuracy[backend]:.3f}")
+
+    agreement = sum(t == o for t, o in zip(predictions["torch"], predictions["onnx"])) / len(texts)
+    print(f"parity: label agreement={agreement:.3f} accuracy delta={accuracy['onnx'] - accuracy['torch']:+.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.topic_filter_service import select_matching_topics, TOPIC_FILTER_THRESHOLD, TOPIC_FILTER_MARGIN
+from services.llm_service import get_filtered_topics
+
+FIXTURE = Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "topic_filter_eval.json"
+
+
+def precision_recall(selected: set, expected: set) -> tuple[float, float]:
+    if not selected and not expected:
+        return 1.0, 1.0
+    hits = len(selected & expected)
+    precision = hits / len(selected) if selected else 0.0
+    recall = hits / len(expected) if expected else 0.0
+    return precision, recall
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare the local embedding topic filter with hand-labelled selections, or with live LLM calls."
+    )
+    parser.add_argument("--threshold", type=float, default=TOPIC_FILTER_THRESHOLD)
+    parser.add_argument("--margin", type=float, default=TOPIC_FILTER_MARGIN)
+    parser.add_argument("--live", action="store_true", help="Compare against live filter_topics calls instead of the hand labels.")
+    args = parser.parse_args()
+
+    cases = json.loads(FIXTURE.read_text())
+    precisions, recalls, exact = [], [], 0
+    local_time = llm_time = 0.0
+    for case in cases:
+        started = time.perf_counter()
+        local = set(select_matching_topics(case["query"], case["cluster_names"], args.threshold, args.margin, False))
+        local_time += time.perf_counter() - started
+
+        expected = set(case["expected"])
+        if args.live:
+            started = time.perf_counter()
+            expected = set(get_filtered_topics(case["query"], ", ".join(case["cluster_names"])))
+            llm_time += time.perf_counter() - started
+
+        precision, recall = precision_recall(local, expected)
+        precisions.append(precision)
+        recalls.append(recall)
+        exact += local == expected
+        print(f"{case['query']:<34} P={precision:.2f} R={recall:.2f} local={sorted(local)} expected={sorted(expected)}")
+
+    print(
+        f"\n{len(cases)} queries: precision={sum(precisions) / len(cases):.2f} "
+        f"recall={sum(recalls) / len(cases):.2f} exact={exact}/{len(cases)} "
+        f"local={local_time / len(cases) * 1000:.1f}ms/query"
+        + (f" llm={llm_time / len(cases) * 1000:.0f}ms/query" if args.live else "")
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,100 @@
-from fastapi import FastAPI, File, UploadFile, Query, Body, HTTPException
+from fastapi import FastAPI, File, UploadFile, Query, Body, HTTPException, Request
 from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 import os
 from dotenv import load_dotenv
-from services.analysis_service import analysis
+from services.analysis_service import (
+    lookup_cached_analysis,
+    uncached_analysis,
+    uncached_analysis_stream,
+    cached_stream_lines,
+)
 from services.pdf_service import generate_pdf_from_data
+from services.model_registry import warm_up, is_ready
+from services.llm_rate_limit_service import LLMRateLimitError
+from services.job_service import JobManager
+from services.result_cache_service import get_result_cache
+from services.admission_service import AdmissionController, AdmissionRejected, estimate_analysis_memory
+from services.cancellation_service import AnalysisCancelled, CancellationToken, CANCELLATION_POLL_SECONDS
+from contextlib import asynccontextmanager
 from google.genai.errors import ServerError
 import json
+import math
 from fpdf import FPDF
 import io
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+async def warm_up_models():
+    try:
+        await asyncio.to_thread(warm_up)
+    except Exception:
+        logger.exception("Model warm-up failed.")
+
+
+admission = AdmissionController()
+
+
+def admission_rejected(e: AdmissionRejected) -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail="Too many analyses in progress, please retry later",
+        headers={"Retry-After": str(e.retry_after)},
+    )
+
+
+async def admitted_job_analysis(file: UploadFile, topics: str, columns: str, on_stage=None):
+    key, result = await lookup_cached_analysis(file, topics, columns)
+    if result is not None:
+        return result
+    # Jobs already wait in their own bounded queue, so they queue for a slot
+    # instead of being rejected.
+    content = await file.read()
+    await file.seek(0)
+    async with admission.admit(estimate_analysis_memory(content), reject_when_full=False):
+        return await uncached_analysis(key, file, topics, columns, on_stage=on_stage)
+
+
+job_manager = JobManager(admitted_job_analysis)
+
+
+class AdmittedStreamingResponse(StreamingResponse):
+    # Releases the admission slot once the response is done, including when
+    # sending the headers fails or the task is cancelled before the body
+    # generator ever starts.
+    def __init__(self, content, cost: int, **kwargs):
+        super().__init__(content, **kwargs)
+        self.cost = cost
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await admission.release(self.cost)
 
-app = FastAPI()
+
+async def cancel_on_disconnect(request: Request, token: CancellationToken):
+    while not token.cancelled:
+        if await request.is_disconnected():
+            logger.info("Client disconnected, cancelling analysis.")
+            token.cancel()
+            return
+        await asyncio.sleep(CANCELLATION_POLL_SECONDS)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warm_up_task = asyncio.create_task(warm_up_models())
+    job_manager.start()
+    yield
+    warm_up_task.cancel()
+    await job_manager.stop()
+
+
+app = FastAPI(lifespan=lifespan)
 origins = [
     "http://localhost:3000",
 ]
@@ -23,13 +107,111 @@ app.add_middleware(
     expose_headers=["Content-Disposition"]
 )
 
+@app.get("/api/health/ready")
+async def readiness():
+    if not is_ready():
+        raise HTTPException(status_code=503, detail="Models are still loading")
+    return {"status": "ready"}
+
 @app.post("/api/feedback/analyze")
-async def analyze_feedback(topics: str | None = Query(default=None), columns: str | None = Query(default=None), file: UploadFile = File(...)):
+async def analyze_feedback(request: Request, topics: str | None = Query(default=None), columns: str | None = Query(default=None), file: UploadFile = File(...)):
+    topics, columns = topics if topics else '', columns if columns else ''
+    # Cache hits are returned right away instead of queueing for a slot.
+    key, cached = await lookup_cached_analysis(file, topics, columns)
+    if cached is not None:
+        return cached
+    content = await file.read()
+    await file.seek(0)
+    cancellation = CancellationToken()
+    watcher = asyncio.create_task(cancel_on_disconnect(request, cancellation))
     try:
-        analysis_results = await analysis(file, topics if topics else '', columns if columns else '')
+        async with admission.admit(estimate_analysis_memory(content)):
+            analysis_results = await uncached_analysis(key, file, topics, columns, cancellation=cancellation)
         return analysis_results
+    except AdmissionRejected as e:
+        raise admission_rejected(e)
+    except AnalysisCancelled:
+        raise HTTPException(status_code=499, detail="Client closed request")
+    except LLMRateLimitError as e:
+        raise HTTPException(
+            status_code=429,
+            detail="LLM providers are rate limiting requests, please retry later",
+            headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))},
+        )
     except ServerError as e:
         raise HTTPException(status_code=500, detail="Error processing file, please check uploaded file structure")
+    finally:
+        watcher.cancel()
+
+@app.post("/api/feedback/analyze/stream")
+async def analyze_feedback_stream(request: Request, topics: str | None = Query(default=None), columns: str | None = Query(default=None), file: UploadFile = File(...)):
+    topics, columns = topics if topics else '', columns if columns else ''
+    content = await file.read()
+    upload = UploadFile(file=io.BytesIO(content), filename=file.filename)
+    key, cached = await lookup_cached_analysis(upload, topics, columns)
+    if cached is not None:
+        return StreamingResponse(cached_stream_lines(cached), media_type="application/x-ndjson")
+    cost = estimate_analysis_memory(content)
+    try:
+        await admission.acquire(cost)
+    except AdmissionRejected as e:
+        raise admission_rejected(e)
+
+    async def admitted_stream():
+        # Servers on ASGI spec >= 2.4 only surface a disconnect when a send
+        # fails, which can be minutes away between stages, so watch for it.
+        cancellation = CancellationToken()
+        watcher = asyncio.create_task(cancel_on_disconnect(request, cancellation))
+        try:
+            async for line in uncached_analysis_stream(key, upload, topics, columns, cancellation=cancellation):
+                yield line
+        finally:
+            watcher.cancel()
+
+    return AdmittedStreamingResponse(admitted_stream(), cost, media_type="application/x-ndjson")
+
+@app.post("/api/feedback/jobs", status_code=202)
+async def submit_analysis_job(topics: str | None = Query(default=None), columns: str | None = Query(default=None), file: UploadFile = File(...)):
+    content = await file.read()
+    try:
+        job = job_manager.submit(file.filename, content, topics if topics else '', columns if columns else '')
+    except asyncio.QueueFull:
+        raise HTTPException(status_code=429, detail="Too many queued analyses, please retry later", headers={"Retry-After": "30"})
+    return job.status_payload()
+
+@app.get("/api/feedback/jobs/{job_id}")
+async def analysis_job_status(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return job.status_payload()
+
+@app.get("/api/feedback/jobs/{job_id}/result")
+async def analysis_job_result(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    if job.status == "failed":
+        raise HTTPException(status_code=job.error["status_code"], detail=job.error["detail"])
+    if job.status != "done":
+        raise HTTPException(status_code=409, detail=f"Job is {job.status} ({job.stage}, {job.percent}%)")
+    return job.result
+
+@app.get("/api/feedback/cache/stats")
+async def result_cache_stats():
+    cache = get_result_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+@app.delete("/api/feedback/cache")
+async def invalidate_result_cache():
+    cache = get_result_cache()
+    return {"removed": cache.invalidate() if cache is not None else 0}
+
+@app.get("/api/feedback/admission")
+async def admission_stats():
+    return admission.stats()
 
 @app.post("/api/feedback/report")
 async def generate_report(data: dict = Body(...)):
@@ -23,7 +23,16 @@ class SentimentResponse(BaseModel):
 class TopicSummary(BaseModel):
     topic: str
     summary: str
-    representative_quotes: list[str]
+
+
+class TopicBatchItem(BaseModel):
+    topic: str
+    description: str
+    summary: str
+
+
+class TopicBatch(BaseModel):
+    topics: list[TopicBatchItem]
 
 
 class TotalSummary(BaseModel):
@@ -97,6 +106,27 @@ CLUSTER_DESCRIPTION_SCHEMA = {
     "additionalProperties": False,
 }
 
+TOPIC_BATCH_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "topics": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "topic": {"type": "string"},
+                    "description": {"type": "string"},
+                    "summary": {"type": "string"},
+                },
+                "required": ["topic", "description", "summary"],
+                "additionalProperties": False,
+            },
+        }
+    },
+    "required": ["topics"],
+    "additionalProperties": False,
+}
+
 CLUSTER_NAME_SCHEMA = {
     "type": "object",
     "properties": {
@@ -148,13 +178,8 @@ TOPIC_SUMMARY_SCHEMA = {
             "type": "string",
             "description": "A concise summary of the content related to this topic.",
         },
-        "representative_quotes": {
-            "type": "array",
-            "items": {"type": "string"},
-            "description": "List of 3 representative quotes from the feedback texts.",
-        },
     },
-    "required": ["topic", "summary", "representative_quotes"],
+    "required": ["topic", "summary"],
     "additionalProperties": False,
 }
 
@@ -0,0 +1,93 @@
+from collections import deque
+from contextlib import asynccontextmanager
+from dotenv import load_dotenv
+import asyncio
+import os
+
+load_dotenv()
+MAX_CONCURRENT_ANALYSES = int(os.getenv("MAX_CONCURRENT_ANALYSES", "2"))
+MAX_QUEUED_ANALYSES = int(os.getenv("MAX_QUEUED_ANALYSES", "8"))
+ANALYSIS_MEMORY_BUDGET_BYTES = int(os.getenv("ANALYSIS_MEMORY_BUDGET_BYTES", "0"))
+ANALYSIS_MEMORY_PER_UPLOAD_BYTE = int(os.getenv("ANALYSIS_MEMORY_PER_UPLOAD_BYTE", "400"))
+ADMISSION_RETRY_AFTER_SECONDS = int(os.getenv("ADMISSION_RETRY_AFTER_SECONDS", "30"))
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, retry_after: int):
+        super().__init__(f"Server is busy, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+def estimate_analysis_memory(content: bytes) -> int:
+    # Upload size times a fixed factor. The file is not parsed yet at
+    # admission time, so every column counts and compressed XLSX uploads
+    # are underestimated.
+    return len(content) * ANALYSIS_MEMORY_PER_UPLOAD_BYTE
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        max_concurrent: int = MAX_CONCURRENT_ANALYSES,
+        max_queued: int = MAX_QUEUED_ANALYSES,
+        memory_budget: int = ANALYSIS_MEMORY_BUDGET_BYTES,
+        retry_after: int = ADMISSION_RETRY_AFTER_SECONDS,
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.memory_budget = memory_budget
+        self.retry_after = retry_after
+        self.active = 0
+        self.memory_in_use = 0
+        self.queue: deque = deque()
+        self.condition = asyncio.Condition()
+
+    @property
+    def waiting(self) -> int:
+        return len(self.queue)
+
+    def can_start(self, cost: int) -> bool:
+        if self.active >= self.max_concurrent:
+            return False
+        # An analysis larger than the whole budget still runs, but only alone.
+        return self.memory_budget <= 0 or self.active == 0 or self.memory_in_use + cost <= self.memory_budget
+
+    async def acquire(self, cost: int = 0, reject_when_full: bool = True):
+        async with self.condition:
+            # Waiters are served in arrival order, so small analyses cannot
+            # keep overtaking a large one that is waiting for memory.
+            if self.queue or not self.can_start(cost):
+                if reject_when_full and self.waiting >= self.max_queued:
+                    raise AdmissionRejected(self.retry_after)
+                ticket = object()
+                self.queue.append(ticket)
+                try:
+                    await self.condition.wait_for(lambda: self.queue[0] is ticket and self.can_start(cost))
+                finally:
+                    self.queue.remove(ticket)
+                    self.condition.notify_all()
+            self.active += 1
+            self.memory_in_use += cost
+
+    async def release(self, cost: int = 0):
+        async with self.condition:
+            self.active -= 1
+            self.memory_in_use -= cost
+            self.condition.notify_all()
+
+    @asynccontextmanager
+    async def admit(self, cost: int = 0, reject_when_full: bool = True):
+        await self.acquire(cost, reject_when_full)
+        try:
+            yield
+        finally:
+            await self.release(cost)
+
+    def stats(self) -> dict:
+        return {
+            "active": self.active,
+            "waiting": self.waiting,
+            "memory_in_use": self.memory_in_use,
+            "max_concurrent": self.max_concurrent,
+            "max_queued": self.max_queued,
+        }
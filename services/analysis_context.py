@@ -0,0 +1,43 @@
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable
+from services.cancellation_service import CancellationToken
+import numpy as np
+import pandas as pd
+import time
+
+
+@dataclass
+class AnalysisContext:
+    processed_df: pd.DataFrame = field(default_factory=pd.DataFrame)
+    results_df: pd.DataFrame = field(default_factory=pd.DataFrame)
+    embeddings: np.ndarray = field(default_factory=lambda: np.array([]))
+    reduced_embeddings: np.ndarray = field(default_factory=lambda: np.array([]))
+    best_n: int = 0
+    start: int = 2
+    end: int = 10
+    stage_timings: dict = field(default_factory=dict)
+    on_stage: Callable[[str], None] | None = None
+    cancellation: CancellationToken = field(default_factory=CancellationToken)
+    fallbacks: list = field(default_factory=list)
+
+    @contextmanager
+    def stage(self, name: str):
+        self.cancellation.raise_if_cancelled()
+        if self.on_stage is not None:
+            self.on_stage(name)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_timings.setdefault(name, []).append(time.perf_counter() - started)
+
+    def record_fallback(self, label: str):
+        # Degraded output must not be pinned in the result cache.
+        self.fallbacks.append(label)
+
+    def release(self):
+        self.processed_df = pd.DataFrame()
+        self.results_df = pd.DataFrame()
+        self.embeddings = np.array([])
+        self.reduced_embeddings = np.array([])
@@ -3,7 +3,9 @@ from pydantic import BaseModel
 import pandas as pd
 import math
 from fastapi.datastructures import UploadFile
+from fastapi import HTTPException
 from models.models import SentimentResponse
+from services.analysis_context import AnalysisContext
 from services.clustering_service import cluster_texts
 from services.file_handler_service import get_dataset_from_file
 from services.llm_service import (
@@ -12,50 +14,236 @@ from services.llm_service import (
     get_total_summary,
     get_processed_columns,
     get_separator,
-    get_dataset_quality_validation
+    get_dataset_quality_validation,
+    MODEL,
+    TOPICS_ANALYSIS_MODE,
+    TOPIC_BATCH_TOKEN_BUDGET,
 )
+from services.llm_rate_limit_service import LLMRateLimitError
+from services.cancellation_service import AnalysisCancelled, CancellationToken, run_with_token
+from services.model_registry import (
+    SENTIMENT_MODEL_NAME,
+    SENTIMENT_BACKEND,
+    SENTIMENT_ONNX_PATH,
+    EMBEDDING_MODEL_NAME,
+    SPACY_MODEL_NAME,
+    DEVICE,
+)
+from services.nlp_service import SENTIMENT_TOKEN_BUDGET
+from services.delimiter_service import DELIMITER_SNIFF_LINES, DELIMITER_MIN_CONFIDENCE
+from services.topic_filter_service import (
+    TOPIC_FILTER_MODE,
+    TOPIC_FILTER_THRESHOLD,
+    TOPIC_FILTER_MARGIN,
+    TOPIC_FILTER_LLM_TIEBREAK,
+)
+from services.topic_sampling_service import (
+    TOPIC_SUMMARY_TOKEN_BUDGET,
+    TOPIC_SAMPLE_OUTLIER_SHARE,
+    NEAR_DUPLICATE_SIMILARITY,
+    REPRESENTATIVE_QUOTES,
+)
+from services.k_selection_service import K_SELECTION_SAMPLE_SIZE, K_SELECTION_N_JOBS
+from services.result_cache_service import get_result_cache, make_result_key, json_default
 import logging
 import asyncio
+import json
 
 logging.basicConfig(level=logging.INFO, format="%(levelname)s:%(name)s:%(message)s")
 logger = logging.getLogger(__name__)
 
 
-async def analysis(file: UploadFile, topics: str = "", columns: str = ""):
-    original_texts, rating_series = await get_dataset_from_file(file, get_separator, topics, columns, get_dataset_quality_validation)
-    logger.info("Dataset loaded and preprocessed.")
+RESULT_CACHE_VERSION = 3
+STREAM_EVENTS = {
+    "dataset": ["filename"],
+    "clusters": ["all_feedbacks", "feedback_analysis", "phrase_clusters", "sentiment"],
+    "topics": ["topics"],
+    "summary": ["summary"],
+}
+
+
+def pipeline_config() -> dict:
+    # Every setting that can change the analysis output belongs here, so that
+    # changing it never serves a stale cached result.
+    return {
+        "version": RESULT_CACHE_VERSION,
+        "llm_model": MODEL,
+        "device": DEVICE,
+        "delimiter_sniff_lines": DELIMITER_SNIFF_LINES,
+        "delimiter_min_confidence": DELIMITER_MIN_CONFIDENCE,
+        "sentiment_model": SENTIMENT_MODEL_NAME,
+        "sentiment_backend": SENTIMENT_BACKEND,
+        "sentiment_onnx_path": SENTIMENT_ONNX_PATH if SENTIMENT_BACKEND == "onnx" else None,
+        "sentiment_token_budget": SENTIMENT_TOKEN_BUDGET,
+        "embedding_model": EMBEDDING_MODEL_NAME,
+        "spacy_model": SPACY_MODEL_NAME,
+        "k_selection_sample_size": K_SELECTION_SAMPLE_SIZE,
+        # Warm-started sequential sweeps can pick a different k than the
+        # parallel one.
+        "k_selection_sequential": K_SELECTION_N_JOBS == 1,
+        "topic_filter_mode": TOPIC_FILTER_MODE,
+        "topic_filter_threshold": TOPIC_FILTER_THRESHOLD,
+        "topic_filter_margin": TOPIC_FILTER_MARGIN,
+        "topic_filter_llm_tiebreak": TOPIC_FILTER_LLM_TIEBREAK,
+        "topics_analysis_mode": TOPICS_ANALYSIS_MODE,
+        "topic_batch_token_budget": TOPIC_BATCH_TOKEN_BUDGET,
+        "topic_summary_token_budget": TOPIC_SUMMARY_TOKEN_BUDGET,
+        "topic_sample_outlier_share": TOPIC_SAMPLE_OUTLIER_SHARE,
+        "near_duplicate_similarity": NEAR_DUPLICATE_SIMILARITY,
+        "representative_quotes": REPRESENTATIVE_QUOTES,
+    }
+
+
+async def result_cache_key(file: UploadFile, topics: str, columns: str) -> str:
+    content = await file.read()
+    await file.seek(0)
+    return make_result_key(content, file.filename, topics, columns, pipeline_config())
+
+
+async def cached_result(file: UploadFile, key: str | None) -> dict | None:
+    cache = get_result_cache()
+    if cache is None or key is None:
+        return None
+    result = await asyncio.to_thread(cache.get, key)
+    if result is not None:
+        logger.info("Serving analysis from the result cache.")
+        result["filename"] = file.filename
+    return result
+
+
+async def store_result(context: AnalysisContext, key: str | None, result: dict):
+    cache = get_result_cache()
+    if cache is None or key is None:
+        return
+    if context.fallbacks:
+        # The cache has no TTL, so a transient provider outage would otherwise
+        # be served for this file until eviction.
+        logger.info(f"Not caching degraded analysis, fallbacks used for: {context.fallbacks}")
+        return
+    await asyncio.to_thread(cache.put, key, result)
+
+
+def in_thread(context: AnalysisContext, fn, *args):
+    return asyncio.to_thread(run_with_token, context.cancellation, fn, *args)
+
+
+async def lookup_cached_analysis(file: UploadFile, topics: str, columns: str) -> tuple[str | None, dict | None]:
+    key = await result_cache_key(file, topics, columns) if get_result_cache() else None
+    return key, await cached_result(file, key)
+
+
+async def analysis(
+    file: UploadFile, topics: str = "", columns: str = "", on_stage=None, cancellation: CancellationToken | None = None
+):
+    key, result = await lookup_cached_analysis(file, topics, columns)
+    if result is not None:
+        return result
+    return await uncached_analysis(key, file, topics, columns, on_stage, cancellation)
+
+
+async def uncached_analysis(
+    key: str | None,
+    file: UploadFile,
+    topics: str = "",
+    columns: str = "",
+    on_stage=None,
+    cancellation: CancellationToken | None = None,
+):
+    context = AnalysisContext(on_stage=on_stage, cancellation=cancellation or CancellationToken())
+    try:
+        result = await run_analysis(context, file, topics, columns)
+    except asyncio.CancelledError:
+        context.cancellation.cancel()
+        raise
+    finally:
+        context.release()
+    await store_result(context, key, result)
+    return result
+
+
+def error_payload(error: Exception) -> dict:
+    if isinstance(error, HTTPException):
+        return {"status_code": error.status_code, "detail": error.detail}
+    if isinstance(error, AnalysisCancelled):
+        return {"status_code": 499, "detail": "Analysis was cancelled"}
+    if isinstance(error, LLMRateLimitError):
+        return {"status_code": 429, "detail": str(error), "retry_after": math.ceil(error.retry_after)}
+    return {"status_code": 500, "detail": "Error processing file, please check uploaded file structure"}
+
+
+def stream_line(event: str, data: dict) -> str:
+    return json.dumps({"event": event, "data": data}, default=json_default) + "\n"
+
+
+def cached_stream_lines(result: dict) -> list[str]:
+    lines = [stream_line(event, {name: result[name] for name in keys}) for event, keys in STREAM_EVENTS.items()]
+    return lines + [stream_line("done", {})]
+
+
+async def analysis_stream(
+    file: UploadFile, topics: str = "", columns: str = "", cancellation: CancellationToken | None = None
+):
+    try:
+        key, result = await lookup_cached_analysis(file, topics, columns)
+    except Exception as e:
+        logger.exception("Result cache lookup failed.")
+        yield stream_line("error", error_payload(e))
+        return
+    if result is not None:
+        for line in cached_stream_lines(result):
+            yield line
+        return
+    async for line in uncached_analysis_stream(key, file, topics, columns, cancellation):
+        yield line
+
+
+async def uncached_analysis_stream(
+    key: str | None, file: UploadFile, topics: str = "", columns: str = "", cancellation: CancellationToken | None = None
+):
+    context = AnalysisContext(cancellation=cancellation or CancellationToken())
+    try:
+        result = {}
+        async for event, data in analysis_events(context, file, topics, columns):
+            result.update(data)
+            yield stream_line(event, data)
+        await store_result(context, key, result)
+        yield stream_line("done", {})
+    except (asyncio.CancelledError, GeneratorExit):
+        # The client went away: stop the worker threads at their next check.
+        context.cancellation.cancel()
+        raise
+    except Exception as e:
+        logger.exception("Streaming analysis failed.")
+        yield stream_line("error", error_payload(e))
+    finally:
+        context.release()
+
+
+async def run_analysis(context: AnalysisContext, file: UploadFile, topics: str = "", columns: str = ""):
     analysis: dict = {}
-    analysis["filename"] = file.filename
+    async for _, partial in analysis_events(context, file, topics, columns):
+        analysis.update(partial)
+    timings = {name: round(sum(durations), 3) for name, durations in context.stage_timings.items()}
+    logger.info(f"Analysis completed. Stage timings (s): {timings}")
+    return analysis
+
+
+async def analysis_events(context: AnalysisContext, file: UploadFile, topics: str = "", columns: str = ""):
+    with context.stage("ingest"):
+        original_texts, rating_series = await get_dataset_from_file(context, file, get_separator, topics, columns, get_dataset_quality_validation)
+    logger.info("Dataset loaded and preprocessed.")
+    yield "dataset", {"filename": file.filename}
     logger.info("Starting feedback list analysis.")
-    feedback_list_analysis_results, number_list = await asyncio.to_thread(
-        feedback_list_analysis, topics
-    )
+    with context.stage("chunking"):
+        feedback_list_analysis_results, number_list = await in_thread(
+            context, feedback_list_analysis, context, topics
+        )
     logger.info("Feedback list analysis completed. Starting text clustering.")
-    phrase_clusters, feedback_analysis, clustering_info = await asyncio.to_thread(
-        cluster_texts, feedback_list_analysis_results, topics
+    phrase_clusters, feedback_analysis, clustering_info = await in_thread(
+        context, cluster_texts, context, feedback_list_analysis_results, topics
     )
     logger.info("Text clustering completed.")
-    analysis["all_feedbacks"] = format_original_feedback_analysis(original_texts, rating_series, feedback_analysis, number_list)
     logger.info(f"Clustering Info: {clustering_info}")
-    analysis["feedback_analysis"] = [
-        {
-            "text": sentiment_response.text,
-            "topic": sentiment_response.topic,
-            "sentiment": feedback_analysis[i].sentiment,
-        }
-        for i, sentiment_response in enumerate(feedback_analysis)
-    ]
-    analysis["phrase_clusters"] = phrase_clusters
-    logger.info("Starting topics analysis.")
-    topics_analysis_results = await asyncio.to_thread(
-        topics_analysis, feedback_analysis
-    )
-    logger.info("Topics analysis completed. Generating total summary.")
-    analysis["topics"] = topics_analysis_results
-    analysis["summary"] = await asyncio.to_thread(
-        get_total_summary, topics_analysis_results
-    )
-    logger.info("Total summary generated. Calculating sentiment counts.")
     counts = {"positive": 0, "negative": 0, "neutral": 0}
 
     for s in feedback_analysis:
@@ -64,9 +252,33 @@ async def analysis(file: UploadFile, topics: str = "", columns: str = ""):
         if key in counts:
             counts[key] += 1
 
-    analysis["sentiment"] = counts
-    logger.info("Analysis completed.")
-    return analysis
+    yield "clusters", {
+        "all_feedbacks": format_original_feedback_analysis(original_texts, rating_series, feedback_analysis, number_list),
+        "feedback_analysis": [
+            {
+                "text": sentiment_response.text,
+                "topic": sentiment_response.topic,
+                "sentiment": feedback_analysis[i].sentiment,
+            }
+            for i, sentiment_response in enumerate(feedback_analysis)
+        ],
+        "phrase_clusters": phrase_clusters,
+        "sentiment": counts,
+    }
+    logger.info("Starting topics analysis.")
+    with context.stage("topics"):
+        topics_analysis_results = await in_thread(
+            context, topics_analysis, context, feedback_analysis
+        )
+    logger.info("Topics analysis completed. Generating total summary.")
+    yield "topics", {"topics": topics_analysis_results}
+    with context.stage("total_summary"):
+        summary = await in_thread(
+            context, get_total_summary, topics_analysis_results
+        )
+    logger.info("Total summary generated.")
+    yield "summary", {"summary": summary}
+
 
 def format_original_feedback_analysis(
     original_texts: list[str],
@@ -0,0 +1,63 @@
+from concurrent.futures import Executor, Future
+from contextvars import ContextVar, copy_context
+from dotenv import load_dotenv
+import threading
+import time
+import os
+
+load_dotenv()
+CANCELLATION_POLL_SECONDS = float(os.getenv("CANCELLATION_POLL_SECONDS", "0.25"))
+
+
+class AnalysisCancelled(Exception):
+    pass
+
+
+class CancellationToken:
+    def __init__(self):
+        self.event = threading.Event()
+
+    def cancel(self):
+        self.event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.event.is_set()
+
+    def raise_if_cancelled(self):
+        if self.event.is_set():
+            raise AnalysisCancelled("Analysis was cancelled")
+
+
+_token: ContextVar[CancellationToken | None] = ContextVar("cancellation_token", default=None)
+
+
+def raise_if_cancelled():
+    token = _token.get()
+    if token is not None:
+        token.raise_if_cancelled()
+
+
+def cancellable_sleep(seconds: float):
+    token = _token.get()
+    if token is None:
+        time.sleep(seconds)
+    elif token.event.wait(seconds):
+        token.raise_if_cancelled()
+
+
+def run_with_token(token: CancellationToken, fn, *args):
+    # Worker-thread entry point: code below fn (loops, LLM retries, router
+    # waits) sees the token through raise_if_cancelled().
+    reset = _token.set(token)
+    try:
+        token.raise_if_cancelled()
+        return fn(*args)
+    finally:
+        _token.reset(reset)
+
+
+def submit_with_token(executor: Executor, fn, *args) -> Future:
+    # ThreadPoolExecutor does not copy context variables, so hand the
+    # caller's context over explicitly.
+    return executor.submit(copy_context().run, fn, *args)
@@ -1,68 +1,87 @@
 from dotenv import load_dotenv
+from dataclasses import dataclass, field
 import numpy as np
-from sentence_transformers import SentenceTransformer
 from umap import UMAP
 from sklearn.manifold import TSNE
-from sklearn.cluster import KMeans, AgglomerativeClustering
+from sklearn.cluster import AgglomerativeClustering
 from sklearn.metrics import (
     silhouette_score,
     davies_bouldin_score,
     calinski_harabasz_score,
 )
 from sklearn.metrics.pairwise import cosine_distances, cosine_similarity
-from services.nlp_service import predict_sentiment, extract_cluster_keywords
-from services.llm_service import get_filtered_topics
+from sklearn.preprocessing import normalize
+from scipy.sparse import csr_matrix
+from services.nlp_service import predict_sentiment, compute_cluster_keywords, name_clusters
+from services.topic_filter_service import filter_cluster_topics
 from services.file_handler_service import create_dataset_from_sentiment_response_list
+from services.analysis_context import AnalysisContext
+from services.model_registry import get_embedding_model, EMBEDDING_MODEL_NAME
+from services.embedding_cache_service import encode_with_cache
+from services.k_selection_service import select_k
 from models.models import SentimentResponse
 import os
-import math
 
 load_dotenv()
 DEVICE = os.getenv("DEVICE", "cpu")
-REDUCED_EMBEDDINGS: list = []
-EMBEDDINGS = np.array([])
-START: int = 2
-END: int = 10
-BEST_N: int = 0
 
 
-def spectral_clustering(num_clusters: int):
-    score = -1.0
-    db_score = float("inf")
-    if num_clusters < 2:
-        print("Silhouette Score not calculated: num_clusters must be >= 2.")
-        return score
-    clustering = AgglomerativeClustering(n_clusters=num_clusters, linkage="ward").fit(
-        REDUCED_EMBEDDINGS
+@dataclass
+class ClusteringResult:
+    labels: np.ndarray
+    coordinates: np.ndarray
+    info: str = ""
+    metrics: dict = field(default_factory=dict)
+
+
+def cluster_distance_metrics(
+    embeddings: np.ndarray, labels: np.ndarray, num_clusters: int
+) -> tuple[float, float]:
+    # Closed-form versions of the mean pairwise cosine distance inside each
+    # cluster and the mean cosine distance between cluster centroids, in O(n*d).
+    embeddings = np.asarray(embeddings, dtype=np.float64)
+    membership = csr_matrix(
+        (np.ones(len(labels)), (labels, np.arange(len(labels)))),
+        shape=(num_clusters, len(labels)),
     )
+    sizes = np.asarray(membership.sum(axis=1)).ravel()
+    normalized_sums = membership @ normalize(embeddings)
+    intra = np.mean(1 - (normalized_sums ** 2).sum(axis=1) / sizes ** 2)
+    centroids = (membership @ embeddings) / sizes[:, None]
+    upper = np.triu_indices(num_clusters, k=1)
+    inter = np.mean(cosine_distances(centroids)[upper])
+    return intra, inter
+
+
+def spectral_clustering(context: AnalysisContext, num_clusters: int) -> ClusteringResult:
+    if num_clusters < 2:
+        return ClusteringResult(
+            labels=np.zeros(len(context.reduced_embeddings), dtype=int),
+            coordinates=context.reduced_embeddings,
+            info="Silhouette Score not calculated: num_clusters must be >= 2.",
+        )
+    with context.stage("ward"):
+        clustering = AgglomerativeClustering(n_clusters=num_clusters, linkage="ward").fit(
+            context.reduced_embeddings
+        )
     spectral_clusters = clustering.labels_
-    clustering_info = ""
-
-    if num_clusters > 1:
-        try:
-            score = silhouette_score(
-                REDUCED_EMBEDDINGS, spectral_clusters, metric="euclidean"
-            )
-            db_score = davies_bouldin_score(REDUCED_EMBEDDINGS, spectral_clusters)
-            ch_score = calinski_harabasz_score(REDUCED_EMBEDDINGS, spectral_clusters)
-            intra = np.mean(
-                [
-                    cosine_distances(EMBEDDINGS[spectral_clusters == i]).mean()
-                    for i in range(num_clusters)
-                ]
-            )
-            inter = np.mean(
-                [
-                    cosine_distances(
-                        EMBEDDINGS[spectral_clusters == i].mean(axis=0).reshape(1, -1),
-                        EMBEDDINGS[spectral_clusters == j].mean(axis=0).reshape(1, -1),
-                    )
-                    for i in range(num_clusters)
-                    for j in range(i + 1, num_clusters)
-                ]
-            )
-            ratio = intra / inter
-            clustering_info = f"""
+    result = ClusteringResult(labels=spectral_clusters, coordinates=context.reduced_embeddings)
+
+    try:
+        score = silhouette_score(
+            context.reduced_embeddings, spectral_clusters, metric="euclidean"
+        )
+        db_score = davies_bouldin_score(context.reduced_embeddings, spectral_clusters)
+        ch_score = calinski_harabasz_score(context.reduced_embeddings, spectral_clusters)
+        intra, inter = cluster_distance_metrics(context.embeddings, spectral_clusters, num_clusters)
+        ratio = intra / inter
+        result.metrics = {
+            "silhouette": score,
+            "davies_bouldin": db_score,
+            "calinski_harabasz": ch_score,
+            "intra_inter_ratio": ratio,
+        }
+        result.info = f"""
 
             Number of cluster labels: {len(np.unique(spectral_clusters))}
             Cluster Quality (Silhouette Score): {score:.4f}
@@ -71,119 +90,74 @@ def spectral_clustering(num_clusters: int):
             Cluster Quality (Intra/Inter Ratio): {ratio:.4f}"
             """
 
-        except ValueError as e:
-            clustering_info = f"Could not calculate Silhouette Score: {e}"
+    except ValueError as e:
+        result.info = f"Could not calculate Silhouette Score: {e}"
+
+    return result
+
+
+def run_clustering(context: AnalysisContext, texts_list: list[str]) -> ClusteringResult:
+    with context.stage("embedding"):
+        model = get_embedding_model()
+        context.embeddings = encode_with_cache(model, EMBEDDING_MODEL_NAME, texts_list, DEVICE)
+    with context.stage("umap"):
+        umap_model = UMAP(n_components=12, min_dist=0.1, metric="cosine", random_state=67)
+        umap_reduced = umap_model.fit_transform(context.embeddings)
+    with context.stage("tsne"):
+        tsne = TSNE(n_components=2, perplexity=30, random_state=42)
+        context.reduced_embeddings = tsne.fit_transform(umap_reduced)
+    with context.stage("k_selection"):
+        k_selection = select_k(context.reduced_embeddings)
 
-    return clustering_info, spectral_clusters
+    context.best_n = k_selection.best_k
+    context.start, context.end = sorted((k_selection.best_k, k_selection.worst_k))
+    return spectral_clustering(context, context.best_n)
 
 
 def cluster_texts(
-    texts_list: list[str], topics: str = ""
+    context: AnalysisContext, texts_list: list[str], topics: str = ""
 ) -> tuple[list[dict], list[SentimentResponse], str]:
-    global EMBEDDINGS, REDUCED_EMBEDDINGS
-
     if not texts_list:
         return ([], [], "")
 
-    sentiments_list = predict_sentiment(texts_list)
-    model = SentenceTransformer("all-MiniLM-L12-v2")
-    EMBEDDINGS = model.encode(texts_list, device=DEVICE)
-    umap_model = UMAP(n_components=12, min_dist=0.1, metric="cosine", random_state=67)
-    umap_reduced = umap_model.fit_transform(EMBEDDINGS)
-    tsne = TSNE(n_components=2, perplexity=30, random_state=42)
-    REDUCED_EMBEDDINGS = tsne.fit_transform(umap_reduced)
-    n = len(REDUCED_EMBEDDINGS)
-    silhouette_scores = []
-    range_n_clusters = range(2, int(np.sqrt(n)))
-    max_silhouette_score = -1.0
-    min_silhouette_score = 1.0
-    best_n_clusters = -1
-    worst_n_clusters = -1
-
-    for n_clusters in range_n_clusters:
-        kmeans = KMeans(n_clusters=n_clusters, init="k-means++", random_state=67)
-        cluster_labels = kmeans.fit_predict(REDUCED_EMBEDDINGS)
-        sil = silhouette_score(REDUCED_EMBEDDINGS, cluster_labels, metric="cosine")
-        db = davies_bouldin_score(REDUCED_EMBEDDINGS, cluster_labels)
-        ch = calinski_harabasz_score(REDUCED_EMBEDDINGS, cluster_labels)
-        base_score = sil + (1 / db)
-        complexity_bonus = math.log(ch) + math.log(n_clusters, 2)
-        score = math.log(ch)
-        silhouette_scores.append(score)
-
-        if score > max_silhouette_score:
-            max_silhouette_score = score
-            best_n_clusters = n_clusters
-        if score < min_silhouette_score:
-            min_silhouette_score = score
-            worst_n_clusters = n_clusters
-
-    tuple = sorted((best_n_clusters, worst_n_clusters))
-
-    global BEST_N, START, END
-    BEST_N = best_n_clusters
-    START = tuple[0]
-    END = tuple[1]
-
-    clustering_info = spectral_clustering(BEST_N)[0]
-    clusters = spectral_clustering(BEST_N)[1]
-    cluster_keywords, cluster_names_list, texts = extract_cluster_keywords(
-        texts=texts_list, labels=clusters, top_n=10
-    )
-    all_topics = set(cluster_names_list)
-    reduced_embeddings = []
-    cluster_names = []
-    texts = []
-    sentiments = []
-    tsne = TSNE(n_components=2, perplexity=30, random_state=42)
-    reduced_tsne = tsne.fit_transform(REDUCED_EMBEDDINGS)
-    reduced_tsne = REDUCED_EMBEDDINGS
-    filtered_topics = get_filtered_topics(
-        selected_topics=topics, all_topics_list=", ".join(all_topics)
-    )
-
-    if not filtered_topics and topics.strip() != "":
-        reduced_embeddings = []
-        cluster_names = []
-        texts = []
-        sentiments = []
-    else:
-        if not filtered_topics:
-            reduced_embeddings = reduced_tsne
-            cluster_names = cluster_names_list
-            texts = texts_list
-            sentiments = sentiments_list
-        else:
-            for i, cluster_name in enumerate(cluster_names_list):
-                if cluster_name in filtered_topics:
-                    reduced_embeddings.append(reduced_tsne[i])
-                    cluster_names.append(cluster_name)
-                    texts.append(texts_list[i])
-                    sentiments.append(sentiments_list[i])
-
-        phrase_clusters = []
-        sentiments_list: list[SentimentResponse] = []
-
-    for i, text in enumerate(texts):
-        sentiment = sentiments[i]
+    with context.stage("sentiment"):
+        sentiments_list = predict_sentiment(texts_list)
+    clustering = run_clustering(context, texts_list)
+    with context.stage("keywords"):
+        cluster_keywords = compute_cluster_keywords(texts_list, clustering.labels, top_n=10)
+    with context.stage("cluster_naming"):
+        cluster_name_map = name_clusters(cluster_keywords, context)
+    cluster_names_list = [cluster_name_map[label] for label in clustering.labels]
+    all_topics = list(dict.fromkeys(cluster_names_list))
+    with context.stage("topic_filter"):
+        filtered_topics = filter_cluster_topics(topics, all_topics)
+    phrase_clusters = []
+    responses: list[SentimentResponse] = []
+    embedding_rows: list[int] = []
+
+    for i, text in enumerate(texts_list):
+        cluster_name = cluster_names_list[i]
+        if topics.strip() != "" and cluster_name not in filtered_topics:
+            continue
         phrase_clusters.append(
             {
-                "x": float(reduced_embeddings[i][0]),
-                "y": float(reduced_embeddings[i][1]),
-                "cluster": cluster_names[i],
+                "x": float(clustering.coordinates[i][0]),
+                "y": float(clustering.coordinates[i][1]),
+                "cluster": cluster_name,
                 "phrase": text,
             }
         )
-        sentiments_list.append(
-            SentimentResponse(text=text, sentiment=sentiment, topic=cluster_names[i])
+        responses.append(
+            SentimentResponse(text=text, sentiment=sentiments_list[i], topic=cluster_name)
         )
+        embedding_rows.append(i)
 
-    create_dataset_from_sentiment_response_list(sentiments_list)
-    return phrase_clusters, sentiments_list, clustering_info
+    create_dataset_from_sentiment_response_list(context, responses, embedding_rows)
+    return phrase_clusters, responses, clustering.info
 
 
 if __name__ == "__main__":
     texts = ["Pricing and Value", "Budget management"]
-    model = SentenceTransformer("all-MiniLM-L12-v2")
+    model = get_embedding_model()
     embeddings = model.encode(texts, device="cuda")
     print(cosine_similarity(embeddings))
@@ -0,0 +1,66 @@
+from collections import Counter
+from dotenv import load_dotenv
+import logging
+import csv
+import io
+import os
+
+load_dotenv()
+DELIMITER_SNIFF_LINES = int(os.getenv("DELIMITER_SNIFF_LINES", "50"))
+DELIMITER_MIN_CONFIDENCE = float(os.getenv("DELIMITER_MIN_CONFIDENCE", "0.9"))
+CANDIDATE_SEPARATORS = [",", ";", "\t", "|"]
+MAX_HEADER_FIELD_LENGTH = 40
+SENTENCE_PUNCTUATION = set(".!?")
+
+logger = logging.getLogger(__name__)
+
+
+def field_counts(sample: str, separator: str) -> list[int]:
+    reader = csv.reader(io.StringIO(sample), delimiter=separator, quotechar='"', skipinitialspace=True)
+    try:
+        return [len(row) for row in reader if row]
+    except csv.Error:
+        return []
+
+
+def looks_like_header(fields: list[str]) -> bool:
+    names = [field.strip() for field in fields]
+    return (
+        all(names)
+        and len(set(names)) == len(names)
+        and all(len(name) <= MAX_HEADER_FIELD_LENGTH and not SENTENCE_PUNCTUATION & set(name) for name in names)
+    )
+
+
+def sniff_delimiter(lines: list[str], max_lines: int = DELIMITER_SNIFF_LINES) -> tuple[str, float]:
+    # Returns the separator ("null" for plain text, one feedback per line) and a
+    # confidence in [0, 1]. Quoted fields are parsed with the csv module, so
+    # separators inside quotes do not change a row's field count.
+    sample = "\n".join(line for line in lines[:max_lines] if line.strip())
+    if not sample:
+        return "null", 0.0
+
+    best_separator, best_consistency, best_fields = "null", 0.0, 1
+    for separator in CANDIDATE_SEPARATORS:
+        counts = field_counts(sample, separator)
+        if not counts:
+            continue
+        fields, matching = Counter(counts).most_common(1)[0]
+        consistency = matching / len(counts)
+        if fields > 1 and (consistency, fields) > (best_consistency, best_fields):
+            best_separator, best_consistency, best_fields = separator, consistency, fields
+
+    if best_separator == "null" or best_consistency < 0.5:
+        return "null", 1.0 - best_consistency
+    header = next(csv.reader(io.StringIO(sample), delimiter=best_separator, quotechar='"', skipinitialspace=True))
+    if len(header) != best_fields or not looks_like_header(header):
+        return best_separator, best_consistency / 2
+    return best_separator, best_consistency
+
+
+def detect_separator(lines: list[str], get_separator) -> str:
+    separator, confidence = sniff_delimiter(lines)
+    if confidence >= DELIMITER_MIN_CONFIDENCE:
+        return separator
+    logger.info(f"Delimiter sniffing is unsure ({separator!r}, {confidence:.2f}), asking the LLM.")
+    return get_separator(lines[0])
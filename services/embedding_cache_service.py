@@ -0,0 +1,156 @@
+from dotenv import load_dotenv
+from pathlib import Path
+import numpy as np
+import unicodedata
+import threading
+import hashlib
+import sqlite3
+import logging
+import time
+import re
+import os
+
+load_dotenv()
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", ".cache/embeddings")
+EMBEDDING_CACHE_MAX_BYTES = int(os.getenv("EMBEDDING_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+INITIAL_CAPACITY = 1024
+SQLITE_BATCH = 500
+
+logger = logging.getLogger(__name__)
+_caches: dict = {}
+_caches_lock = threading.Lock()
+
+
+def normalize_text(text: str) -> str:
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", text)).strip()
+
+
+def cache_key(model_name: str, text: str) -> str:
+    return hashlib.sha256(f"{model_name}\0{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    def __init__(self, directory: str, model_name: str, dim: int, max_bytes: int):
+        self.model_name = model_name
+        self.dim = dim
+        self.max_rows = max(1, max_bytes // (dim * np.dtype(np.float16).itemsize))
+        self.directory = Path(directory) / re.sub(r"[^\w.-]", "_", model_name)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.vectors_path = self.directory / f"vectors.{dim}.f16"
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(str(self.directory / f"index.{dim}.sqlite"), check_same_thread=False)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, slot INTEGER UNIQUE, last_used REAL)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)")
+        self.db.commit()
+        self.vectors = None
+        self.capacity = 0
+        used_rows = self.db.execute("SELECT COALESCE(MAX(slot) + 1, 0) FROM entries").fetchone()[0]
+        self._ensure_capacity(max(used_rows, min(INITIAL_CAPACITY, self.max_rows)))
+
+    def _ensure_capacity(self, rows: int):
+        if rows <= self.capacity:
+            return
+        capacity = max(rows, min(self.capacity * 2, self.max_rows))
+        if self.vectors is not None:
+            self.vectors.flush()
+            del self.vectors
+        with open(self.vectors_path, "ab") as f:
+            f.truncate(capacity * self.dim * np.dtype(np.float16).itemsize)
+        self.vectors = np.memmap(self.vectors_path, dtype=np.float16, mode="r+", shape=(capacity, self.dim))
+        self.capacity = capacity
+
+    def _lookup(self, keys: list[str]) -> dict[str, int]:
+        slots = {}
+        for start in range(0, len(keys), SQLITE_BATCH):
+            batch = keys[start:start + SQLITE_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            rows = self.db.execute(
+                f"SELECT key, slot FROM entries WHERE key IN ({placeholders})", batch
+            ).fetchall()
+            slots.update(rows)
+        return slots
+
+    def _allocate(self, count: int) -> list[int]:
+        used = self.db.execute("SELECT COUNT(*), COALESCE(MAX(slot) + 1, 0) FROM entries").fetchone()
+        free_rows = self.max_rows - used[0]
+        if free_rows < count:
+            evicted = self.db.execute(
+                "SELECT key, slot FROM entries ORDER BY last_used LIMIT ?", (count - free_rows,)
+            ).fetchall()
+            self.db.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key, _ in evicted])
+            logger.info(f"Evicted {len(evicted)} cached embeddings for '{self.model_name}'.")
+        taken = {slot for (slot,) in self.db.execute("SELECT slot FROM entries")}
+        slots = []
+        slot = 0
+        while len(slots) < count:
+            if slot not in taken:
+                slots.append(slot)
+            slot += 1
+        self._ensure_capacity(slots[-1] + 1 if slots else 0)
+        return slots
+
+    def get_many(self, texts: list[str]) -> list[np.ndarray | None]:
+        keys = [cache_key(self.model_name, text) for text in texts]
+        with self.lock:
+            slots = self._lookup(list(set(keys)))
+            now = time.time()
+            self.db.executemany(
+                "UPDATE entries SET last_used = ? WHERE key = ?", [(now, key) for key in slots]
+            )
+            self.db.commit()
+            return [
+                np.array(self.vectors[slots[key]], dtype=np.float32) if key in slots else None
+                for key in keys
+            ]
+
+    def put_many(self, texts: list[str], vectors: np.ndarray):
+        entries = {cache_key(self.model_name, text): vector for text, vector in zip(texts, vectors)}
+        if len(entries) > self.max_rows:
+            entries = dict(list(entries.items())[: self.max_rows])
+        with self.lock:
+            existing = self._lookup(list(entries))
+            new_keys = [key for key in entries if key not in existing]
+            slots = self._allocate(len(new_keys))
+            for key, slot in zip(new_keys, slots):
+                self.vectors[slot] = entries[key]
+            self.vectors.flush()
+            now = time.time()
+            self.db.executemany(
+                "INSERT INTO entries (key, slot, last_used) VALUES (?, ?, ?)",
+                [(key, slot, now) for key, slot in zip(new_keys, slots)],
+            )
+            self.db.commit()
+
+
+def get_embedding_cache(model_name: str, dim: int) -> EmbeddingCache:
+    with _caches_lock:
+        cache = _caches.get((model_name, dim))
+        if cache is None:
+            cache = EmbeddingCache(EMBEDDING_CACHE_DIR, model_name, dim, EMBEDDING_CACHE_MAX_BYTES)
+            _caches[(model_name, dim)] = cache
+        return cache
+
+
+def encode_with_cache(model, model_name: str, texts: list[str], device: str) -> np.ndarray:
+    if EMBEDDING_CACHE_MAX_BYTES <= 0 or not texts:
+        return model.encode(texts, device=device)
+
+    cache = get_embedding_cache(model_name, model.get_sentence_embedding_dimension())
+    cached = cache.get_many(texts)
+    misses = list(dict.fromkeys(text for text, vector in zip(texts, cached) if vector is None))
+    logger.info(f"Embedding cache: {len(texts) - sum(v is None for v in cached)} hits, {len(misses)} texts to encode.")
+
+    if misses:
+        # Round misses through float16 like the stored vectors, so the
+        # embeddings (and clusters) do not depend on what was cached before.
+        encoded = np.asarray(model.encode(misses, device=device)).astype(np.float16).astype(np.float32)
+        cache.put_many(misses, encoded)
+        encoded_by_text = dict(zip(misses, encoded))
+        cached = [
+            vector if vector is not None else encoded_by_text[text]
+            for text, vector in zip(texts, cached)
+        ]
+
+    return np.vstack(cached).astype(np.float32)
@@ -1,10 +1,13 @@
 from fastapi.datastructures import UploadFile
 from fastapi import HTTPException
 import pandas as pd
+import numpy as np
 import io
-
-POCESSED_DF: pd.DataFrame = pd.DataFrame()
-RESULTS_DF: pd.DataFrame = pd.DataFrame()
+import asyncio
+from services.analysis_context import AnalysisContext
+from services.cancellation_service import AnalysisCancelled, run_with_token
+from services.llm_rate_limit_service import LLMRateLimitError
+from services.delimiter_service import detect_separator
 
 
 def get_dataset_from_file_path(file_path: str) -> pd.DataFrame:
@@ -16,7 +19,7 @@ import pandas as pd
 from fastapi import UploadFile, HTTPException
 
 async def get_dataset_from_file(
-    file: UploadFile, get_separator, topics: str, columns: str, get_dataset_quality_validation
+    context: AnalysisContext, file: UploadFile, get_separator, topics: str, columns: str, get_dataset_quality_validation
 ):
     if file.filename is None:
         raise HTTPException(
@@ -32,28 +35,37 @@ async def get_dataset_from_file(
             detail="Invalid file type. Please upload a CSV | TXT | JSON | XLSX.",
         )
 
+    contents = await file.read()
+    # Parsing and the separator/validation LLM calls (throttling, retries,
+    # router waits) block, so keep them off the event loop.
+    return await asyncio.to_thread(
+        run_with_token, context.cancellation, load_dataset,
+        context, filetype, contents, get_separator, columns, get_dataset_quality_validation,
+    )
+
+
+def load_dataset(
+    context: AnalysisContext, filetype: str, contents: bytes, get_separator, columns: str, get_dataset_quality_validation
+):
     try:
         df: pd.DataFrame
         match filetype:
             case "csv":
-                df = pd.read_csv(file.file)
+                df = pd.read_csv(io.BytesIO(contents))
             case "txt":
-                contents = await file.read()
                 decoded_content = contents.decode("utf-8")
                 lines = decoded_content.splitlines()
                 if len(lines) == 0:
                     raise HTTPException(status_code=400, detail="Empty TXT file.")
-                separator = get_separator(lines[0])
+                separator = detect_separator(lines, get_separator)
                 if separator == "null":
                     df = pd.DataFrame({"Text": lines})
                 else:
                     df = pd.read_csv(io.StringIO(decoded_content), sep=separator)
             case "json":
-                df = pd.read_json(file.file)
+                df = pd.read_json(io.BytesIO(contents))
             case "xlsx":
-                contents = await file.read()
-                buffer = io.BytesIO(contents)
-                df = pd.read_excel(buffer)
+                df = pd.read_excel(io.BytesIO(contents))
 
         if columns:
             column_names = [col.strip() for col in columns.split(',')]
@@ -100,7 +112,7 @@ async def get_dataset_from_file(
                 detail=f"Dataset validation failed: {validation_result.reason}",
             )
 
-    except HTTPException:
+    except (HTTPException, LLMRateLimitError, AnalysisCancelled):
         raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error loading file: {e}")
@@ -114,22 +126,23 @@ async def get_dataset_from_file(
             status_code=400, detail="Dataset size exceeds 15,000 rows."
         )
 
-    global POCESSED_DF
-    POCESSED_DF = df.copy()
+    context.processed_df = df.copy()
 
-    if "Text" in POCESSED_DF.columns:
-        text_series = POCESSED_DF["Text"]
+    if "Text" in context.processed_df.columns:
+        text_series = context.processed_df["Text"]
     else:
         text_series = pd.Series([], dtype=object)
 
-    if "Rating" in POCESSED_DF.columns:
-        rating_series = POCESSED_DF["Rating"]
+    if "Rating" in context.processed_df.columns:
+        rating_series = context.processed_df["Rating"]
     else:
         rating_series = pd.Series([], dtype=object)
 
     return text_series, rating_series
 
-def create_dataset_from_sentiment_response_list(sentiments_list):
+def create_dataset_from_sentiment_response_list(
+    context: AnalysisContext, sentiments_list, embedding_rows: list[int] | None = None
+):
     df = pd.DataFrame(
         {
             "text": [sentiment.text for sentiment in sentiments_list],
@@ -137,12 +150,13 @@ def create_dataset_from_sentiment_response_list(sentiments_list):
             "topic": [sentiment.topic for sentiment in sentiments_list],
         }
     )
-    global RESULTS_DF
-    RESULTS_DF = df.copy()
+    if embedding_rows is not None:
+        df["embedding_row"] = embedding_rows
+    context.results_df = df.copy()
 
 
-def get_feedback_list() -> list[str]:
-    df = POCESSED_DF
+def get_feedback_list(context: AnalysisContext) -> list[str]:
+    df = context.processed_df
     return df["Text"].dropna().apply(process_text).values.tolist()
 
 
@@ -154,18 +168,27 @@ def process_text(text) -> str:
     return re.sub(r"\d+", "", text)
 
 
-def get_topics_list() -> list[str]:
-    df = RESULTS_DF
+def get_topics_list(context: AnalysisContext) -> list[str]:
+    df = context.results_df
     return df["topic"].apply(process_text).values.tolist()
 
 
-def get_feedback_analysis_by_topic(topic: str | None) -> list[str]:
-    df = RESULTS_DF.copy()
+def get_feedback_analysis_by_topic(context: AnalysisContext, topic: str | None) -> list[str]:
+    df = context.results_df.copy()
     if topic:
         df = df[df["topic"] == topic]
     return df["text"].values.tolist()
 
 
-def get_feedbacks_info() -> list[str]:
-    df = RESULTS_DF
+def get_topic_embeddings(context: AnalysisContext, topic: str | None) -> np.ndarray | None:
+    df = context.results_df
+    if "embedding_row" not in df.columns or len(context.embeddings) == 0:
+        return None
+    if topic:
+        df = df[df["topic"] == topic]
+    return context.embeddings[df["embedding_row"].to_numpy()]
+
+
+def get_feedbacks_info(context: AnalysisContext) -> list[str]:
+    df = context.results_df
     return ("'" + df["Text"].astype(str) + "'. " + df["Rating"].astype(str)).tolist()
@@ -0,0 +1,117 @@
+from dataclasses import dataclass, field
+from dotenv import load_dotenv
+from fastapi import UploadFile
+from services.analysis_service import error_payload
+import threading
+import asyncio
+import logging
+import uuid
+import time
+import io
+import os
+
+load_dotenv()
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "1"))
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "16"))
+JOB_RESULT_TTL_SECONDS = int(os.getenv("JOB_RESULT_TTL_SECONDS", "3600"))
+
+# Percent complete when each pipeline stage starts, roughly proportional to
+# its share of a typical analysis.
+STAGE_PROGRESS = {
+    "ingest": 0,
+    "chunking": 5,
+    "sentiment": 15,
+    "embedding": 25,
+    "umap": 35,
+    "tsne": 45,
+    "k_selection": 55,
+    "ward": 62,
+    "keywords": 65,
+    "cluster_naming": 68,
+    "topic_filter": 72,
+    "topics": 75,
+    "total_summary": 92,
+}
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Job:
+    id: str
+    status: str = "queued"
+    stage: str = "queued"
+    percent: int = 0
+    result: dict | None = None
+    error: dict | None = None
+    created: float = field(default_factory=time.time)
+    finished: float | None = None
+
+    def update_stage(self, stage: str):
+        self.stage = stage
+        self.percent = max(self.percent, STAGE_PROGRESS.get(stage, self.percent))
+
+    def status_payload(self) -> dict:
+        payload = {"job_id": self.id, "status": self.status, "stage": self.stage, "percent": self.percent}
+        if self.error is not None:
+            payload["error"] = self.error
+        return payload
+
+
+class JobManager:
+    def __init__(self, runner, workers: int = JOB_WORKERS, queue_size: int = JOB_QUEUE_SIZE, ttl_seconds: int = JOB_RESULT_TTL_SECONDS):
+        self.runner = runner
+        self.workers = workers
+        self.queue_size = queue_size
+        self.ttl_seconds = ttl_seconds
+        self.jobs: dict[str, Job] = {}
+        self.lock = threading.Lock()
+        self.queue: asyncio.Queue | None = None
+        self.tasks: list[asyncio.Task] = []
+
+    def start(self):
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self.tasks = [asyncio.create_task(self.worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+    def submit(self, filename: str, content: bytes, topics: str = "", columns: str = "") -> Job:
+        self.purge_expired()
+        job = Job(id=uuid.uuid4().hex)
+        self.queue.put_nowait((job, filename, content, topics, columns))
+        with self.lock:
+            self.jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        self.purge_expired()
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def purge_expired(self):
+        cutoff = time.time() - self.ttl_seconds
+        with self.lock:
+            expired = [job_id for job_id, job in self.jobs.items() if job.finished is not None and job.finished < cutoff]
+            for job_id in expired:
+                del self.jobs[job_id]
+
+    async def worker(self):
+        while True:
+            job, filename, content, topics, columns = await self.queue.get()
+            await self.run(job, UploadFile(file=io.BytesIO(content), filename=filename), topics, columns)
+            self.queue.task_done()
+
+    async def run(self, job: Job, upload: UploadFile, topics: str, columns: str):
+        job.status = "running"
+        try:
+            job.result = await self.runner(upload, topics, columns, on_stage=job.update_stage)
+            job.status, job.stage, job.percent = "done", "done", 100
+        except Exception as e:
+            logger.exception(f"Analysis job {job.id} failed.")
+            job.status, job.error = "failed", error_payload(e)
+        finally:
+            job.finished = time.time()
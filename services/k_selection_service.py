@@ -0,0 +1,131 @@
+from dataclasses import dataclass, field
+from dotenv import load_dotenv
+from joblib import Parallel, delayed
+from services.cancellation_service import raise_if_cancelled
+from sklearn.cluster import KMeans
+from sklearn.metrics import (
+    silhouette_score,
+    davies_bouldin_score,
+    calinski_harabasz_score,
+)
+import numpy as np
+import math
+import os
+
+load_dotenv()
+K_SELECTION_SAMPLE_SIZE = int(os.getenv("K_SELECTION_SAMPLE_SIZE", "2000"))
+K_SELECTION_N_JOBS = int(os.getenv("K_SELECTION_N_JOBS", "-1"))
+RANDOM_STATE = 67
+
+
+@dataclass
+class KSelectionResult:
+    best_k: int = -1
+    worst_k: int = -1
+    scores: dict = field(default_factory=dict)
+
+
+def candidate_ks(n: int) -> range:
+    return range(2, int(np.sqrt(n)))
+
+
+def stratified_sample(labels: np.ndarray, sample_size: int, random_state: int = RANDOM_STATE) -> np.ndarray:
+    n = len(labels)
+    if n <= sample_size:
+        return np.arange(n)
+    rng = np.random.default_rng(random_state)
+    clusters, counts = np.unique(labels, return_counts=True)
+    quotas = np.maximum(2, np.floor(counts * sample_size / n).astype(int))
+    quotas = np.minimum(quotas, counts)
+    indices = [
+        rng.choice(np.flatnonzero(labels == cluster), size=quota, replace=False)
+        for cluster, quota in zip(clusters, quotas)
+    ]
+    return np.sort(np.concatenate(indices))
+
+
+def score_labels(points: np.ndarray, labels: np.ndarray, sample_size: int | None) -> dict:
+    if sample_size is not None:
+        sample = stratified_sample(labels, sample_size)
+        points, labels = points[sample], labels[sample]
+    ch = calinski_harabasz_score(points, labels)
+    return {
+        "silhouette": silhouette_score(points, labels, metric="cosine"),
+        "davies_bouldin": davies_bouldin_score(points, labels),
+        "calinski_harabasz": ch,
+        "score": math.log(ch),
+    }
+
+
+def next_init(points: np.ndarray, centers: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    distances = np.full(len(points), np.inf)
+    for center in centers:
+        np.minimum(distances, ((points - center) ** 2).sum(axis=1), out=distances)
+    total = distances.sum()
+    if total == 0:
+        new_center = points[rng.integers(len(points))]
+    else:
+        new_center = points[rng.choice(len(points), p=distances / total)]
+    return np.vstack([centers, new_center])
+
+
+def fit_k(points: np.ndarray, k: int, sample_size: int | None, init=None) -> tuple[dict, np.ndarray]:
+    if init is None:
+        kmeans = KMeans(n_clusters=k, init="k-means++", random_state=RANDOM_STATE)
+    else:
+        kmeans = KMeans(n_clusters=k, init=init, n_init=1, random_state=RANDOM_STATE)
+    labels = kmeans.fit_predict(points)
+    return score_labels(points, labels, sample_size), kmeans.cluster_centers_
+
+
+def pick_best_and_worst(scores: dict) -> KSelectionResult:
+    result = KSelectionResult(scores=scores)
+    max_score = -1.0
+    min_score = 1.0
+    for k, metrics in scores.items():
+        if metrics["score"] > max_score:
+            max_score = metrics["score"]
+            result.best_k = k
+        if metrics["score"] < min_score:
+            min_score = metrics["score"]
+            result.worst_k = k
+    return result
+
+
+def select_k(
+    points: np.ndarray,
+    sample_size: int = K_SELECTION_SAMPLE_SIZE,
+    n_jobs: int = K_SELECTION_N_JOBS,
+) -> KSelectionResult:
+    ks = list(candidate_ks(len(points)))
+
+    if n_jobs != 1:
+        raise_if_cancelled()
+        # Results arrive in order as workers finish; closing the generator on
+        # cancellation aborts the candidates that have not been dispatched.
+        fits = Parallel(n_jobs=n_jobs, return_as="generator")(delayed(fit_k)(points, k, sample_size) for k in ks)
+        scores = {}
+        try:
+            for k, (metrics, _) in zip(ks, fits):
+                raise_if_cancelled()
+                scores[k] = metrics
+        finally:
+            fits.close()
+        return pick_best_and_worst(scores)
+
+    rng = np.random.default_rng(RANDOM_STATE)
+    scores = {}
+    centers = None
+    for k in ks:
+        raise_if_cancelled()
+        init = None if centers is None else next_init(points, centers, rng)
+        scores[k], centers = fit_k(points, k, sample_size, init=init)
+    return pick_best_and_worst(scores)
+
+
+def exhaustive_k_sweep(points: np.ndarray) -> KSelectionResult:
+    scores = {}
+    for k in candidate_ks(len(points)):
+        raise_if_cancelled()
+        scores[k] = fit_k(points, k, sample_size=None)[0]
+    return pick_best_and_worst(scores)
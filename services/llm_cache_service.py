@@ -0,0 +1,119 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dotenv import load_dotenv
+from pathlib import Path
+import threading
+import hashlib
+import sqlite3
+import json
+import time
+import os
+
+load_dotenv()
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".cache/llm/responses.sqlite")
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "20000"))
+
+_bypass: ContextVar[bool] = ContextVar("llm_cache_bypass", default=False)
+_hit: ContextVar[bool] = ContextVar("llm_cache_hit", default=False)
+_cache = None
+_cache_lock = threading.Lock()
+
+
+class LLMCache:
+    def __init__(self, path: str, ttl_seconds: int, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value TEXT, created REAL, last_used REAL)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)")
+        self.db.commit()
+
+    def get(self, key: str) -> str | None:
+        now = time.time()
+        with self.lock:
+            row = self.db.execute(
+                "SELECT value FROM entries WHERE key = ? AND created >= ?",
+                (key, now - self.ttl_seconds),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.db.execute("UPDATE entries SET last_used = ? WHERE key = ?", (now, key))
+            self.db.commit()
+            return row[0]
+
+    def put(self, key: str, value: str):
+        now = time.time()
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO entries (key, value, created, last_used) VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            self.db.execute("DELETE FROM entries WHERE created < ?", (now - self.ttl_seconds,))
+            self.db.execute(
+                "DELETE FROM entries WHERE key IN "
+                "(SELECT key FROM entries ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self.db.commit()
+
+    def clear(self):
+        with self.lock:
+            self.db.execute("DELETE FROM entries")
+            self.db.commit()
+
+    def stats(self) -> dict:
+        with self.lock:
+            entries = self.db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            return {"hits": self.hits, "misses": self.misses, "entries": entries}
+
+
+def get_llm_cache() -> LLMCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMCache(LLM_CACHE_PATH, LLM_CACHE_TTL_SECONDS, LLM_CACHE_MAX_ENTRIES)
+        return _cache
+
+
+@contextmanager
+def llm_cache_disabled():
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def make_cache_key(provider: str, model: str, prompt_parts: list, schema) -> str:
+    payload = json.dumps([provider, model, prompt_parts, schema], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def served_from_cache() -> bool:
+    # Whether the last cached_llm_call in this context was answered by the
+    # cache rather than the provider.
+    return _hit.get()
+
+
+def cached_llm_call(provider: str, model: str, prompt_parts: list, schema, call) -> str:
+    _hit.set(False)
+    if LLM_CACHE_MAX_ENTRIES <= 0 or _bypass.get():
+        return call()
+
+    cache = get_llm_cache()
+    key = make_cache_key(provider, model, prompt_parts, schema)
+    value = cache.get(key)
+    _hit.set(value is not None)
+    if value is None:
+        value = call()
+        cache.put(key, value)
+    return value
@@ -0,0 +1,143 @@
+from cerebras.cloud.sdk import APIConnectionError
+from dotenv import load_dotenv
+from typing import Callable
+from services.cancellation_service import cancellable_sleep, raise_if_cancelled
+import threading
+import logging
+import random
+import httpx
+import json
+import time
+import os
+
+load_dotenv()
+LLM_RETRY_ATTEMPTS = int(os.getenv("LLM_RETRY_ATTEMPTS", "4"))
+LLM_RETRY_BASE_SECONDS = float(os.getenv("LLM_RETRY_BASE_SECONDS", "0.5"))
+LLM_RETRY_MAX_SECONDS = float(os.getenv("LLM_RETRY_MAX_SECONDS", "20"))
+PROVIDER_RATE_LIMITS = {
+    "gemini": (int(os.getenv("GEMINI_RPM", "1000")), int(os.getenv("GEMINI_TPM", "1000000"))),
+    "cerebras": (int(os.getenv("CEREBRAS_RPM", "30")), int(os.getenv("CEREBRAS_TPM", "60000"))),
+}
+MODEL_RATE_LIMITS = {
+    model: tuple(limits) for model, limits in json.loads(os.getenv("LLM_MODEL_RATE_LIMITS", "{}")).items()
+}
+CHARS_PER_TOKEN = 4
+TRANSIENT_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+logger = logging.getLogger(__name__)
+
+
+class LLMRateLimitError(Exception):
+    def __init__(self, provider: str, retry_after: float):
+        super().__init__(f"{provider} rate limit exceeded, retry after {retry_after:.0f}s")
+        self.provider = provider
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60
+        self.available = float(per_minute)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        with self.lock:
+            now = time.monotonic()
+            self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+            self.updated = now
+            self.available -= min(amount, self.capacity)
+            return max(0.0, -self.available / self.rate)
+
+
+class RateLimiter:
+    def __init__(self, provider_limits: dict, model_limits: dict):
+        self.provider_limits = provider_limits
+        self.model_limits = model_limits
+        self.buckets: dict[tuple[str, str], TokenBucket] = {}
+        self.lock = threading.Lock()
+
+    def bucket(self, scope: str, unit: str, per_minute: int) -> TokenBucket:
+        with self.lock:
+            key = (scope, unit)
+            if key not in self.buckets:
+                self.buckets[key] = TokenBucket(per_minute)
+            return self.buckets[key]
+
+    def reserve(self, provider: str, model: str, tokens: int) -> float:
+        wait = 0.0
+        scopes = [(provider, self.provider_limits.get(provider)), (f"{provider}/{model}", self.model_limits.get(model))]
+        for scope, limits in scopes:
+            if limits is None:
+                continue
+            rpm, tpm = limits
+            if rpm > 0:
+                wait = max(wait, self.bucket(scope, "requests", rpm).reserve(1))
+            if tpm > 0:
+                wait = max(wait, self.bucket(scope, "tokens", tpm).reserve(tokens))
+        return wait
+
+    def acquire(self, provider: str, model: str, tokens: int):
+        wait = self.reserve(provider, model, tokens)
+        if wait > 0:
+            logger.info(f"Throttling {provider}/{model} for {wait:.2f}s.")
+            cancellable_sleep(wait)
+
+
+_rate_limiter = RateLimiter(PROVIDER_RATE_LIMITS, MODEL_RATE_LIMITS)
+
+
+def get_rate_limiter() -> RateLimiter:
+    return _rate_limiter
+
+
+def estimate_tokens(prompt_parts: list) -> int:
+    return len(json.dumps(prompt_parts)) // CHARS_PER_TOKEN + 1
+
+
+def status_code(error: Exception) -> int | None:
+    code = getattr(error, "code", None)
+    if not isinstance(code, int):
+        code = getattr(error, "status_code", None)
+    return code if isinstance(code, int) else None
+
+
+def retry_after(error: Exception) -> float | None:
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers or "retry-after" not in headers:
+        return None
+    try:
+        return float(headers["retry-after"])
+    except ValueError:
+        return None
+
+
+def is_transient(error: Exception) -> bool:
+    if isinstance(error, (ConnectionError, TimeoutError, httpx.TransportError, APIConnectionError)):
+        return True
+    return status_code(error) in TRANSIENT_STATUS_CODES
+
+
+def backoff_delay(attempt: int) -> float:
+    return random.uniform(0, min(LLM_RETRY_MAX_SECONDS, LLM_RETRY_BASE_SECONDS * 2**attempt))
+
+
+def call_with_retry(provider: str, model: str, prompt_parts: list, call: Callable):
+    tokens = estimate_tokens(prompt_parts)
+    for attempt in range(LLM_RETRY_ATTEMPTS):
+        raise_if_cancelled()
+        get_rate_limiter().acquire(provider, model, tokens)
+        try:
+            return call()
+        except Exception as e:
+            if not is_transient(e):
+                raise
+            delay = min(LLM_RETRY_MAX_SECONDS, max(backoff_delay(attempt), retry_after(e) or 0))
+            if attempt == LLM_RETRY_ATTEMPTS - 1:
+                if status_code(e) == 429:
+                    raise LLMRateLimitError(provider, retry_after(e) or delay) from e
+                raise
+            logger.warning(f"Transient {provider}/{model} error, retrying in {delay:.2f}s: {e!r}")
+            cancellable_sleep(delay)
@@ -0,0 +1,201 @@
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from services.llm_cache_service import served_from_cache
+from services.cancellation_service import AnalysisCancelled, CANCELLATION_POLL_SECONDS, raise_if_cancelled, submit_with_token
+from collections import deque
+from dotenv import load_dotenv
+from typing import Callable
+import numpy as np
+import threading
+import logging
+import time
+import os
+
+load_dotenv()
+LLM_HEDGE_ENABLED = os.getenv("LLM_HEDGE_ENABLED", "true").lower() == "true"
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+LLM_HEDGE_DEFAULT_DELAY_SECONDS = float(os.getenv("LLM_HEDGE_DEFAULT_DELAY_SECONDS", "8"))
+LLM_HEDGE_MIN_DELAY_SECONDS = float(os.getenv("LLM_HEDGE_MIN_DELAY_SECONDS", "1"))
+LLM_BREAKER_WINDOW = int(os.getenv("LLM_BREAKER_WINDOW", "50"))
+LLM_BREAKER_ERROR_RATE = float(os.getenv("LLM_BREAKER_ERROR_RATE", "0.5"))
+LLM_BREAKER_SLOW_SECONDS = float(os.getenv("LLM_BREAKER_SLOW_SECONDS", "30"))
+LLM_BREAKER_COOLDOWN_SECONDS = float(os.getenv("LLM_BREAKER_COOLDOWN_SECONDS", "30"))
+LLM_ROUTER_WORKERS = int(os.getenv("LLM_ROUTER_WORKERS", "32"))
+MIN_SAMPLES = 10
+PROVIDERS = ("gemini", "cerebras")
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    def __init__(self, window: int, error_rate: float, slow_seconds: float, cooldown_seconds: float):
+        self.outcomes: deque[tuple[bool, float]] = deque(maxlen=window)
+        self.error_rate = error_rate
+        self.slow_seconds = slow_seconds
+        self.cooldown_seconds = cooldown_seconds
+        self.opened_at: float | None = None
+        self.probing = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self.lock:
+            if self.opened_at is None:
+                return "closed"
+            if self.probing or time.monotonic() - self.opened_at >= self.cooldown_seconds:
+                return "half_open"
+            return "open"
+
+    def allow(self) -> bool:
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if self.probing or time.monotonic() - self.opened_at < self.cooldown_seconds:
+                return False
+            self.probing = True
+            return True
+
+    def record(self, ok: bool, latency: float):
+        with self.lock:
+            self.outcomes.append((ok, latency))
+            if self.probing:
+                self.probing = False
+                if ok and latency < self.slow_seconds:
+                    self.opened_at = None
+                    self.outcomes.clear()
+                else:
+                    self.opened_at = time.monotonic()
+            elif self.opened_at is None and self.should_trip():
+                self.opened_at = time.monotonic()
+
+    def abandon(self):
+        # A cancelled call says nothing about the provider; just free the
+        # half-open probe so another call can take it.
+        with self.lock:
+            self.probing = False
+
+    def should_trip(self) -> bool:
+        if len(self.outcomes) < MIN_SAMPLES:
+            return False
+        errors = sum(not ok for ok, _ in self.outcomes)
+        if errors / len(self.outcomes) >= self.error_rate:
+            return True
+        latencies = [latency for ok, latency in self.outcomes if ok]
+        return len(latencies) >= MIN_SAMPLES and float(np.percentile(latencies, 95)) > self.slow_seconds
+
+    def latency_percentile(self, percentile: float) -> float | None:
+        with self.lock:
+            latencies = [latency for ok, latency in self.outcomes if ok]
+        if len(latencies) < MIN_SAMPLES:
+            return None
+        return float(np.percentile(latencies, percentile))
+
+
+class ProviderRouter:
+    def __init__(
+        self,
+        providers=PROVIDERS,
+        hedge_enabled: bool = LLM_HEDGE_ENABLED,
+        hedge_percentile: float = LLM_HEDGE_PERCENTILE,
+        default_delay: float = LLM_HEDGE_DEFAULT_DELAY_SECONDS,
+        min_delay: float = LLM_HEDGE_MIN_DELAY_SECONDS,
+        max_workers: int = LLM_ROUTER_WORKERS,
+    ):
+        self.breakers = {
+            provider: CircuitBreaker(
+                LLM_BREAKER_WINDOW, LLM_BREAKER_ERROR_RATE, LLM_BREAKER_SLOW_SECONDS, LLM_BREAKER_COOLDOWN_SECONDS
+            )
+            for provider in providers
+        }
+        self.hedge_enabled = hedge_enabled
+        self.hedge_percentile = hedge_percentile
+        self.default_delay = default_delay
+        self.min_delay = min_delay
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-router")
+
+    def hedge_delay(self, provider: str) -> float:
+        latency = self.breakers[provider].latency_percentile(self.hedge_percentile)
+        return self.default_delay if latency is None else max(latency, self.min_delay)
+
+    def submit(self, provider: str, call: Callable) -> Future:
+        breaker = self.breakers[provider]
+
+        def run():
+            start = time.monotonic()
+            try:
+                result = call()
+            except AnalysisCancelled:
+                breaker.abandon()
+                raise
+            except Exception:
+                breaker.record(False, time.monotonic() - start)
+                raise
+            # Cache hits take milliseconds and would drag the latency
+            # percentiles (and so the hedge delay) far below the provider's.
+            if not served_from_cache():
+                breaker.record(True, time.monotonic() - start)
+            return result
+
+        return submit_with_token(self.executor, run)
+
+    def call(self, calls: list[tuple[str, Callable]]):
+        remaining = list(calls)
+        running: dict[Future, str] = {}
+
+        def launch(force: bool) -> bool:
+            for i, (provider, call) in enumerate(remaining):
+                if self.breakers[provider].allow():
+                    break
+            else:
+                if not force or not remaining:
+                    return False
+                i = 0
+            provider, call = remaining.pop(i)
+            running[self.submit(provider, call)] = provider
+            return True
+
+        raise_if_cancelled()
+        launch(force=True)
+        primary = next(iter(running.values()))
+        hedge_at = time.monotonic() + self.hedge_delay(primary) if self.hedge_enabled else None
+        last_error: Exception | None = None
+        while running:
+            timeout = CANCELLATION_POLL_SECONDS
+            hedge_due = hedge_at is not None and bool(remaining)
+            if hedge_due:
+                timeout = min(timeout, max(0.0, hedge_at - time.monotonic()))
+            done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+            # A cancelled analysis stops waiting here; in-flight provider
+            # calls finish in the background and their results are dropped.
+            raise_if_cancelled()
+            if not done:
+                if hedge_due and time.monotonic() >= hedge_at:
+                    if launch(force=False):
+                        logger.info(f"Hedging slow {primary} call with a second provider.")
+                    hedge_at = None
+                continue
+            for future in done:
+                provider = running.pop(future)
+                try:
+                    return future.result()
+                except Exception as e:
+                    logger.warning(f"LLM provider {provider} failed: {e!r}")
+                    last_error = e
+            if not running:
+                launch(force=True)
+        raise last_error
+
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_router() -> ProviderRouter:
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = ProviderRouter()
+        return _router
+
+
+def route_llm_call(gemini_call: Callable, cerebras_call: Callable):
+    return get_router().call([("gemini", gemini_call), ("cerebras", cerebras_call)])
@@ -5,26 +5,122 @@ import os
 from dotenv import load_dotenv
 import typing
 import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, Future
+from pydantic import TypeAdapter
 from models.models import *
 from fastapi import HTTPException
+from services.analysis_context import AnalysisContext
 from services.file_handler_service import (
     get_feedback_list,
     get_feedback_analysis_by_topic,
+    get_topic_embeddings,
 )
 from services.text_chunking_service import feedback_chunking
+from services.llm_cache_service import cached_llm_call
+from services.llm_rate_limit_service import call_with_retry
+from services.llm_router_service import route_llm_call
+from services.cancellation_service import AnalysisCancelled, submit_with_token
+from services.topic_sampling_service import (
+    select_representative_texts,
+    select_representative_quotes,
+    estimate_prompt_tokens,
+    pack_topic_samples,
+)
 
 load_dotenv()
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 CEREBRAS_API_KEY = os.getenv("CEREBRAS_API_KEY")
 MODEL = os.getenv("MODEL")
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "8"))
+TOPICS_ANALYSIS_MODE = os.getenv("TOPICS_ANALYSIS_MODE", "per_topic")
+TOPIC_BATCH_TOKEN_BUDGET = int(os.getenv("TOPIC_BATCH_TOKEN_BUDGET", "24000"))
 client = genai.Client(api_key=GEMINI_API_KEY)
 client_cerebras = Cerebras(api_key=CEREBRAS_API_KEY)
+logger = logging.getLogger(__name__)
+
+
+class GeminiResponse(typing.NamedTuple):
+    text: str
+    parsed: typing.Any
+
+
+def generate_gemini_content(model: str, contents: list, config: dict) -> GeminiResponse:
+    adapter = TypeAdapter(config["response_schema"])
+
+    prompt_parts = [part.text for content in contents for part in content.parts]
+
+    def call() -> str:
+        text = call_with_retry(
+            "gemini",
+            model,
+            prompt_parts,
+            lambda: client.models.generate_content(model=model, contents=contents, config=config).text,
+        )
+        adapter.validate_json(text)
+        return text
+
+    text = cached_llm_call("gemini", model, prompt_parts, adapter.json_schema(), call)
+    return GeminiResponse(text=text, parsed=adapter.validate_json(text))
+
+
+JSON_SCHEMA_TYPES = {
+    "object": dict,
+    "array": list,
+    "string": str,
+    "integer": int,
+    "number": (int, float),
+    "boolean": bool,
+}
+
+
+def validate_json_schema(value, schema: dict, path: str = "$"):
+    # Covers the keywords used by the response schemas in models.models.
+    expected = JSON_SCHEMA_TYPES.get(schema.get("type"))
+    if expected is not None and (
+        not isinstance(value, expected) or (isinstance(value, bool) and schema["type"] != "boolean")
+    ):
+        raise ValueError(f"{path} should be of type {schema['type']}")
+    if isinstance(value, dict):
+        properties = schema.get("properties", {})
+        missing = [name for name in schema.get("required", []) if name not in value]
+        if missing:
+            raise ValueError(f"{path} is missing {missing}")
+        if schema.get("additionalProperties") is False and set(value) - set(properties):
+            raise ValueError(f"{path} has unexpected keys {sorted(set(value) - set(properties))}")
+        for name, item in value.items():
+            if name in properties:
+                validate_json_schema(item, properties[name], f"{path}.{name}")
+    elif isinstance(value, list) and "items" in schema:
+        for i, item in enumerate(value):
+            validate_json_schema(item, schema["items"], f"{path}[{i}]")
+
+
+def create_cerebras_completion(model: str, messages: list, response_format: dict) -> str:
+    prompt_parts = [[message["role"], message["content"]] for message in messages]
+
+    def call() -> str:
+        response = call_with_retry(
+            "cerebras",
+            model,
+            prompt_parts,
+            lambda: client_cerebras.chat.completions.create(
+                model=model, messages=messages, response_format=response_format
+            ),
+        )
+        content = response.choices[0].message.content
+        # Validate before the response can be cached, as the Gemini path does.
+        validate_json_schema(json.loads(content), response_format["json_schema"]["schema"])
+        return content
+
+    return cached_llm_call("cerebras", model, prompt_parts, response_format, call)
 
 
 def generate_topics_description_cerebras(
     cluster_names: list[str],
 ) -> list[ClusterDescription]:
-    response = client_cerebras.chat.completions.create(
+    response = create_cerebras_completion(
         model="gpt-oss-120b",
         messages=[
             {
@@ -59,14 +155,14 @@ def generate_topics_description_cerebras(
         },
     )
 
-    response_json = json.loads(response.choices[0].message.content)
+    response_json = json.loads(response)
     raw_list = response_json.get("clusters", [])
     cluster_descriptions = [ClusterDescription(**item) for item in raw_list]
     return cluster_descriptions
 
 
 def generate_topics_description(cluster_names: list[str]) -> list[ClusterDescription]:
-    response = client.models.generate_content(
+    response = generate_gemini_content(
         model=f"{MODEL}",
         contents=[
             types.Content(
@@ -102,14 +198,14 @@ def generate_topics_description(cluster_names: list[str]) -> list[ClusterDescrip
 
 
 def get_topic_description(cluster_names: list[str]) -> list[ClusterDescription]:
-    try:
-        return generate_topics_description(cluster_names)
-    except Exception:
-        return generate_topics_description_cerebras(cluster_names)
+    return route_llm_call(
+        lambda: generate_topics_description(cluster_names),
+        lambda: generate_topics_description_cerebras(cluster_names),
+    )
 
 
 def generate_cluster_name(cluster_terms: str) -> str:
-    response = client.models.generate_content(
+    response = generate_gemini_content(
         model="gemini-2.5-flash-lite",
         contents=[
             types.Content(
@@ -144,7 +240,7 @@ def generate_cluster_name(cluster_terms: str) -> str:
 
 
 def generate_cluster_name_cerebras(cluster_terms: str) -> str:
-    response = client_cerebras.chat.completions.create(
+    response = create_cerebras_completion(
         model="gpt-oss-120b",
         messages=[
             {
@@ -180,19 +276,19 @@ def generate_cluster_name_cerebras(cluster_terms: str) -> str:
         },
     )
 
-    response_json = json.loads(response.choices[0].message.content)
+    response_json = json.loads(response)
     return response_json["name"]
 
 
 def get_cluster_name(cluster_terms: str) -> str:
-    try:
-        return generate_cluster_name(cluster_terms)
-    except Exception:
-        return generate_cluster_name_cerebras(cluster_terms)
+    return route_llm_call(
+        lambda: generate_cluster_name(cluster_terms),
+        lambda: generate_cluster_name_cerebras(cluster_terms),
+    )
 
 
 def generate_separator(row: str) -> str:
-    response = client.models.generate_content(
+    response = generate_gemini_content(
         model=f"{MODEL}",
         contents=[
             types.Content(
@@ -228,7 +324,7 @@ def generate_separator(row: str) -> str:
 
 
 def generate_separator_cerebras(row: str) -> str:
-    response = client_cerebras.chat.completions.create(
+    response = create_cerebras_completion(
         model="gpt-oss-120b",
         messages=[
             {
@@ -261,18 +357,105 @@ def generate_separator_cerebras(row: str) -> str:
         },
     )
 
-    response_json = json.loads(response.choices[0].message.content)
+    response_json = json.loads(response)
     return response_json["separator"]
 
 
 def get_separator(row: str) -> str:
+    return route_llm_call(
+        lambda: generate_separator(row),
+        lambda: generate_separator_cerebras(row),
+    )
+
+
+def result_or_default(future: Future, default, label: str, context: AnalysisContext | None = None):
     try:
-        return generate_separator(row)
+        return future.result()
+    except AnalysisCancelled:
+        raise
     except Exception:
-        return generate_separator_cerebras(row)
+        logger.exception(f"LLM call failed for {label}.")
+        if context is not None:
+            context.record_fallback(label)
+        return default
 
 
-def topics_analysis(feedback_analysis: list[SentimentResponse]) -> list[dict]:
+def format_topic_summary(summary: str, representative_quotes: list[str]) -> str:
+    return "Topic summary: " + summary + '\n'*2 + "Representative quotes: " + '\n  ● ' + '\n  ● '.join(representative_quotes)
+
+
+def summarize_topic(topic_texts: list[str], topic_embeddings, topic_name: str) -> str:
+    quotes = select_representative_quotes(topic_texts, topic_embeddings)
+    sample = select_representative_texts(topic_texts, topic_embeddings)
+    started = time.perf_counter()
+    try:
+        return format_topic_summary(get_topic_summary(sample, topic_name), quotes)
+    finally:
+        logger.info(
+            f"Topic '{topic_name}': sent {len(sample)}/{len(topic_texts)} texts, "
+            f"~{estimate_prompt_tokens(sample)} prompt tokens, {time.perf_counter() - started:.2f}s."
+        )
+
+
+def per_topic_summaries(
+    topic_inputs: dict, context: AnalysisContext | None = None
+) -> tuple[dict[str, str], dict[str, str]]:
+    topic_names = list(topic_inputs)
+
+    with ThreadPoolExecutor(max_workers=LLM_CONCURRENCY) as executor:
+        description_future = submit_with_token(executor, get_topic_description, topic_names)
+        summary_futures = [
+            submit_with_token(executor, summarize_topic, texts, embeddings, topic)
+            for topic, (texts, embeddings) in topic_inputs.items()
+        ]
+        topic_descriptions = result_or_default(description_future, [], "topic descriptions", context)
+        summaries = [
+            result_or_default(future, "Topic summary unavailable.", f"topic '{topic}'", context)
+            for topic, future in zip(topic_names, summary_futures)
+        ]
+
+    descriptions = {topic: item.description for topic, item in zip(topic_names, topic_descriptions)}
+    return descriptions, dict(zip(topic_names, summaries))
+
+
+def batched_topic_summaries(
+    topic_inputs: dict, context: AnalysisContext | None = None
+) -> tuple[dict[str, str], dict[str, str]]:
+    samples = {
+        topic: select_representative_texts(texts, embeddings) for topic, (texts, embeddings) in topic_inputs.items()
+    }
+    batches = pack_topic_samples(samples, TOPIC_BATCH_TOKEN_BUDGET)
+
+    with ThreadPoolExecutor(max_workers=LLM_CONCURRENCY) as executor:
+        futures = [submit_with_token(executor, get_topics_batch, batch) for batch in batches]
+        results = [
+            result_or_default(future, None, f"topic batch of {len(batch)}")
+            for batch, future in zip(batches, futures)
+        ]
+
+    descriptions: dict[str, str] = {}
+    summaries: dict[str, str] = {}
+    fallback = {}
+    for batch, result in zip(batches, results):
+        if result is None:
+            fallback.update({topic: topic_inputs[topic] for topic in batch})
+            continue
+        for topic in batch:
+            texts, embeddings = topic_inputs[topic]
+            descriptions[topic] = result[topic].description
+            summaries[topic] = format_topic_summary(
+                result[topic].summary, select_representative_quotes(texts, embeddings)
+            )
+
+    if fallback:
+        logger.warning(f"Batched topic analysis failed for {len(fallback)} topics, falling back to per-topic calls.")
+        fallback_descriptions, fallback_summaries = per_topic_summaries(fallback, context)
+        descriptions.update(fallback_descriptions)
+        summaries.update(fallback_summaries)
+    return descriptions, summaries
+
+
+def topics_analysis(context: AnalysisContext, feedback_analysis: list[SentimentResponse]) -> list[dict]:
     topics: dict = {}
 
     for sentiment in feedback_analysis:
@@ -281,22 +464,33 @@ def topics_analysis(feedback_analysis: list[SentimentResponse]) -> list[dict]:
         else:
             topics[sentiment.topic] += 1
 
-    topic_descriptions = get_topic_description([topic for topic in topics])
+    topic_inputs = {
+        topic: (get_feedback_analysis_by_topic(context, topic), get_topic_embeddings(context, topic))
+        for topic in topics
+    }
+    if TOPICS_ANALYSIS_MODE == "batched":
+        descriptions, summaries = batched_topic_summaries(topic_inputs, context)
+    else:
+        descriptions, summaries = per_topic_summaries(topic_inputs, context)
+    for topic in topics:
+        if topic not in descriptions:
+            context.record_fallback(f"description of topic '{topic}'")
 
     return [
         {
             "topic": topic,
             "count": topics[topic],
-            "summary": "Topic description: " + topic_descriptions[i].description
+            "summary": "Topic description: "
+            + descriptions.get(topic, "unavailable.")
             + "\n"*2
-            + get_topic_summary(get_feedback_analysis_by_topic(topic), topic),
+            + summaries[topic],
         }
-        for i, topic in enumerate(topics)
+        for topic in topics
     ]
 
 
 def generate_total_summary(topics_analysis: list[dict]) -> str:
-    response = client.models.generate_content(
+    response = generate_gemini_content(
         model=f"{MODEL}",
         contents=[
             types.Content(
@@ -326,7 +520,7 @@ def generate_total_summary(topics_analysis: list[dict]) -> str:
 
 
 def generate_total_summary_cerebras(topics_analysis: list[dict]) -> str:
-    response = client_cerebras.chat.completions.create(
+    response = create_cerebras_completion(
         model="gpt-oss-120b",
         messages=[
             {
@@ -356,19 +550,19 @@ def generate_total_summary_cerebras(topics_analysis: list[dict]) -> str:
         },
     )
 
-    response_json = json.loads(response.choices[0].message.content)
+    response_json = json.loads(response)
     return response_json["summary"]
 
 
 def get_total_summary(topics_analysis: list[dict]) -> str:
-    try:
-        return generate_total_summary(topics_analysis)
-    except Exception:
-        return generate_total_summary_cerebras(topics_analysis)
+    return route_llm_call(
+        lambda: generate_total_summary(topics_analysis),
+        lambda: generate_total_summary_cerebras(topics_analysis),
+    )
 
 
 def generate_topic_summary(topic_texts: list[str], topic_name: str) -> str:
-    response = client.models.generate_content(
+    response = generate_gemini_content(
         model=f"{MODEL}",
         contents=[
             types.Content(
@@ -379,7 +573,6 @@ def generate_topic_summary(topic_texts: list[str], topic_name: str) -> str:
                         You are an expert Data Analyst specializing in synthesizing qualitative user feedback into actionable business insights.
                         Analyze the provided list of user feedback comments, which all relate to the single topic of "{topic_name}".
                         Your task is to explain topic name in simple terms, generate a concise, neutral, and informative summary that captures the main points from the feedback list.
-                        Find THREE Representative quotes in feedback texts list that thr best describe the cluster.
                         """,
                     ),
                     types.Part(
@@ -397,12 +590,11 @@ def generate_topic_summary(topic_texts: list[str], topic_name: str) -> str:
         },
     )
     summary: TopicSummary = typing.cast(TopicSummary, response.parsed)
-    result = "Topic summary: " + summary.summary + '\n'*2 + "Representative quotes: " + '\n  ● ' + '\n  ● '.join(summary.representative_quotes)
-    return result
+    return summary.summary
 
 
 def generate_topic_summary_cerebras(topic_texts: list[str], topic_name: str) -> str:
-    response = client_cerebras.chat.completions.create(
+    response = create_cerebras_completion(
         model="gpt-oss-120b",
         messages=[
             {
@@ -411,7 +603,6 @@ def generate_topic_summary_cerebras(topic_texts: list[str], topic_name: str) ->
                 You are an expert Data Analyst specializing in synthesizing qualitative user feedback into actionable business insights.
                 Analyze the provided list of user feedback comments, which all relate to the single topic of "{topic_name}".
                 Your task is to explain topic name in simple terms, generate a concise, neutral, and informative summary that captures the main points from the feedback list.
-                Find THREE Representative quotes in feedback texts list that thr best describe the cluster.
                 """,
             },
             {
@@ -433,20 +624,103 @@ def generate_topic_summary_cerebras(topic_texts: list[str], topic_name: str) ->
         },
     )
 
-    response_json = json.loads(response.choices[0].message.content)
-    result = "Topic summary: " + response_json["summary"] + '\n'*2 + "Representative quotes: " + '\n  ● ' + '\n  ● '.join(response_json["representative_quotes"])
-    return result
+    response_json = json.loads(response)
+    return response_json["summary"]
 
 
 def get_topic_summary(topic_texts: list[str], topic_name: str) -> str:
-    try:
-        return generate_topic_summary(topic_texts, topic_name)
-    except Exception:
-        return generate_topic_summary_cerebras(topic_texts, topic_name)
+    return route_llm_call(
+        lambda: generate_topic_summary(topic_texts, topic_name),
+        lambda: generate_topic_summary_cerebras(topic_texts, topic_name),
+    )
+
+
+def generate_topics_batch(topic_samples: dict[str, list[str]]) -> list[TopicBatchItem]:
+    response = generate_gemini_content(
+        model=f"{MODEL}",
+        contents=[
+            types.Content(
+                role="user",
+                parts=[
+                    types.Part(
+                        text="""
+                        You are an expert Data Analyst specializing in synthesizing qualitative user feedback into actionable business insights.
+                        You receive several topics, each with a sample of the user feedback comments that belong to it.
+                        For EACH topic:
+                        1.  **description:** Explain in 2-3 sentences of clear business language what the topic covers and how it differs from the other topics.
+                        2.  **summary:** Generate a concise, neutral, and informative summary that captures the main points from that topic's feedback.
+                        Return exactly one entry per topic and copy every topic name exactly as given.
+                        """,
+                    ),
+                    types.Part(
+                        text=f"""
+                        - topics with feedback texts: {json.dumps(topic_samples, ensure_ascii=False)}
+                        """,
+                    ),
+                ],
+            ),
+        ],
+        config={
+            "response_mime_type": "application/json",
+            "response_schema": TopicBatch,
+        },
+    )
+    batch: TopicBatch = typing.cast(TopicBatch, response.parsed)
+    return batch.topics
+
+
+def generate_topics_batch_cerebras(topic_samples: dict[str, list[str]]) -> list[TopicBatchItem]:
+    response = create_cerebras_completion(
+        model="gpt-oss-120b",
+        messages=[
+            {
+                "role": "system",
+                "content": """
+                You are an expert Data Analyst specializing in synthesizing qualitative user feedback into actionable business insights.
+                You receive several topics, each with a sample of the user feedback comments that belong to it.
+                For EACH topic:
+                1.  **description:** Explain in 2-3 sentences of clear business language what the topic covers and how it differs from the other topics.
+                2.  **summary:** Generate a concise, neutral, and informative summary that captures the main points from that topic's feedback.
+                Return exactly one entry per topic and copy every topic name exactly as given.
+                """,
+            },
+            {
+                "role": "user",
+                "content": f"""
+                INPUT DATA:
+                - topics with feedback texts: {json.dumps(topic_samples, ensure_ascii=False)}
+                """,
+            },
+        ],
+        response_format={
+            "type": "json_schema",
+            "json_schema": {
+                "name": "topic_batch_schema",
+                "strict": True,
+                "schema": TOPIC_BATCH_SCHEMA,
+            },
+        },
+    )
+
+    return TopicBatch.model_validate_json(response).topics
+
+
+def get_topics_batch(topic_samples: dict[str, list[str]]) -> dict[str, TopicBatchItem]:
+    def validated(generate):
+        items = {item.topic: item for item in generate(topic_samples)}
+        missing = set(topic_samples) - set(items)
+        if missing:
+            raise ValueError(f"Batched response is missing topics: {sorted(missing)}")
+        return items
+
+    return route_llm_call(
+        lambda: validated(generate_topics_batch),
+        lambda: validated(generate_topics_batch_cerebras),
+    )
 
 
 def filter_topics(selected_topics: str, all_topics_list: str) -> list[str]:
-    response = client.models.generate_content(
+    response = generate_gemini_content(
         model="gemini-flash-lite-latest",
         contents=[
             types.Content(
@@ -483,7 +757,7 @@ def filter_topics(selected_topics: str, all_topics_list: str) -> list[str]:
 
 
 def filter_topics_cerebras(selected_topics: str, all_topics_list: str) -> list[str]:
-    response = client_cerebras.chat.completions.create(
+    response = create_cerebras_completion(
         model="gpt-oss-120b",
         messages=[
             {
@@ -521,7 +795,7 @@ def filter_topics_cerebras(selected_topics: str, all_topics_list: str) -> list[s
         },
     )
 
-    response_json = json.loads(response.choices[0].message.content)
+    response_json = json.loads(response)
     return response_json["items"]
 
 
@@ -529,13 +803,13 @@ def get_filtered_topics(selected_topics: str, all_topics_list: str) -> list[str]
     if len(selected_topics) == 0:
         return []
 
-    try:
-        return filter_topics(selected_topics, all_topics_list)
-    except Exception:
-        return filter_topics_cerebras(selected_topics, all_topics_list)
+    return route_llm_call(
+        lambda: filter_topics(selected_topics, all_topics_list),
+        lambda: filter_topics_cerebras(selected_topics, all_topics_list),
+    )
 
 
-def feedback_list_analysis(topics_text: str = "") -> tuple[list[str], list[int]]:
+def feedback_list_analysis(context: AnalysisContext, topics_text: str = "") -> tuple[list[str], list[int]]:
     if topics_text.replace(" ", "") == "":
         topics = []
     else:
@@ -543,13 +817,13 @@ def feedback_list_analysis(topics_text: str = "") -> tuple[list[str], list[int]]
         if not topics:
             raise HTTPException(status_code=400, detail="Invalid topics")
 
-    feedback_list: list[str] = get_feedback_list()
+    feedback_list: list[str] = get_feedback_list(context)
     texts_list, number_list = feedback_chunking(feedback_list)
     return texts_list, number_list
 
 
 def generate_topics_list(topics_text: str) -> list[str]:
-    response = client.models.generate_content(
+    response = generate_gemini_content(
         model="gemini-flash-lite-latest",
         contents=[
             types.Content(
@@ -576,7 +850,7 @@ def generate_topics_list(topics_text: str) -> list[str]:
 
 
 def generate_topics_list_cerebras(topics_text: str) -> list[str]:
-    response = client_cerebras.chat.completions.create(
+    response = create_cerebras_completion(
         model="gpt-oss-120b",
         messages=[
             {
@@ -605,19 +879,19 @@ def generate_topics_list_cerebras(topics_text: str) -> list[str]:
         },
     )
 
-    response_json = json.loads(response.choices[0].message.content)
+    response_json = json.loads(response)
     return response_json["items"]
 
 
 def get_topics_list(topics_text: str) -> list[str]:
-    try:
-        return generate_topics_list(topics_text)
-    except Exception:
-        return generate_topics_list_cerebras(topics_text)
+    return route_llm_call(
+        lambda: generate_topics_list(topics_text),
+        lambda: generate_topics_list_cerebras(topics_text),
+    )
 
 
 def process_columnes_names(list_of_column_names: list[str]) -> list[str]:
-    response = client.models.generate_content(
+    response = generate_gemini_content(
         model=f"gemini-flash-lite-latest",
         contents=[
             types.Content(
@@ -660,7 +934,7 @@ def process_columnes_names(list_of_column_names: list[str]) -> list[str]:
 
 
 def process_columnes_names_cerebras(list_of_column_names: list[str]) -> list[str]:
-    response = client_cerebras.chat.completions.create(
+    response = create_cerebras_completion(
         model="gpt-oss-120b",
         messages=[
             {
@@ -705,12 +979,12 @@ def process_columnes_names_cerebras(list_of_column_names: list[str]) -> list[str
         },
     )
 
-    response_json = json.loads(response.choices[0].message.content)
+    response_json = json.loads(response)
     return response_json["items"]
 
 
 def validate_dataset_quality(text_sample: list[str], rating_sample: list[str]) -> DatasetQuality:
-    response = client.models.generate_content(
+    response = generate_gemini_content(
         model=f"{MODEL}",
         contents=[
             types.Content(
@@ -757,7 +1031,7 @@ def validate_dataset_quality(text_sample: list[str], rating_sample: list[str]) -
 
 
 def validate_dataset_quality_cerebras(text_sample: list[str], rating_sample: list[str]) -> DatasetQuality:
-    response = client_cerebras.chat.completions.create(
+    response = create_cerebras_completion(
         model="gpt-oss-120b",
         messages=[
             {
@@ -805,19 +1079,19 @@ def validate_dataset_quality_cerebras(text_sample: list[str], rating_sample: lis
         },
     )
 
-    response_json = json.loads(response.choices[0].message.content)
+    response_json = json.loads(response)
     return DatasetQuality(**response_json)
 
 
 def get_dataset_quality_validation(text_sample: list[str], rating_sample: list[str]) -> DatasetQuality:
-    try:
-        return validate_dataset_quality(text_sample, rating_sample)
-    except Exception:
-        return validate_dataset_quality_cerebras(text_sample, rating_sample)
+    return route_llm_call(
+        lambda: validate_dataset_quality(text_sample, rating_sample),
+        lambda: validate_dataset_quality_cerebras(text_sample, rating_sample),
+    )
 
 
 def segment_text_gemini(text: str) -> list[str]:
-    response = client.models.generate_content(
+    response = generate_gemini_content(
         model=f"{MODEL}",
         contents=[
             types.Content(
@@ -856,7 +1130,7 @@ def segment_text_gemini(text: str) -> list[str]:
 
 
 def segment_text_cerebras(text: str) -> list[str]:
-    response = client_cerebras.chat.completions.create(
+    response = create_cerebras_completion(
         model="gpt-oss-120b",
         messages=[
             {
@@ -891,19 +1165,19 @@ def segment_text_cerebras(text: str) -> list[str]:
         },
     )
 
-    response_json = json.loads(response.choices[0].message.content)
+    response_json = json.loads(response)
     return response_json["items"]
 
 
 def segment_text(texts: str) -> list[str]:
-    try:
-        return segment_text_gemini(texts)
-    except Exception:
-        return segment_text_cerebras(texts)
+    return route_llm_call(
+        lambda: segment_text_gemini(texts),
+        lambda: segment_text_cerebras(texts),
+    )
 
 
 def get_processed_columns(list_of_column_names: list[str]) -> list[str]:
-    try:
-        return process_columnes_names(list_of_column_names)
-    except Exception:
-        return process_columnes_names_cerebras(list_of_column_names)
+    return route_llm_call(
+        lambda: process_columnes_names(list_of_column_names),
+        lambda: process_columnes_names_cerebras(list_of_column_names),
+    )
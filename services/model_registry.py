@@ -0,0 +1,99 @@
+from dotenv import load_dotenv
+from transformers import AutoTokenizer, AutoModelForSequenceClassification
+from sentence_transformers import SentenceTransformer
+from services.onnx_sentiment_service import load_onnx_sentiment_model, OnnxParityError
+import spacy
+import torch
+import threading
+import logging
+import os
+
+load_dotenv()
+DEVICE = os.getenv("DEVICE", "cpu")
+SENTIMENT_MODEL_NAME = "tabularisai/multilingual-sentiment-analysis"
+EMBEDDING_MODEL_NAME = "all-MiniLM-L12-v2"
+SPACY_MODEL_NAME = "en_core_web_sm"
+SENTIMENT_BACKEND = os.getenv("SENTIMENT_BACKEND", "torch")
+SENTIMENT_ONNX_PATH = os.getenv("SENTIMENT_ONNX_PATH", ".cache/onnx/sentiment.int8.onnx")
+WARM_UP_TEXTS = [
+    "The support team was quick and helpful, but the pricing is too high.",
+    "App crashes on startup.",
+]
+
+logger = logging.getLogger(__name__)
+_models: dict = {}
+_lock = threading.Lock()
+_ready = threading.Event()
+
+
+def _load_spacy():
+    try:
+        return spacy.load(SPACY_MODEL_NAME)
+    except OSError:
+        from spacy.cli import download
+        download(SPACY_MODEL_NAME)
+        return spacy.load(SPACY_MODEL_NAME)
+
+
+def _load_sentiment_model(backend: str = SENTIMENT_BACKEND):
+    tokenizer = AutoTokenizer.from_pretrained(SENTIMENT_MODEL_NAME)
+    model = AutoModelForSequenceClassification.from_pretrained(SENTIMENT_MODEL_NAME)
+    model.eval()
+    if backend == "onnx":
+        try:
+            model = load_onnx_sentiment_model(model, tokenizer, SENTIMENT_ONNX_PATH)
+        except OnnxParityError:
+            logger.exception("Falling back to the torch sentiment model.")
+    elif backend != "torch":
+        raise ValueError(f"Unknown SENTIMENT_BACKEND '{backend}', expected 'torch' or 'onnx'.")
+    return tokenizer, model
+
+
+def _load_embedding_model():
+    return SentenceTransformer(EMBEDDING_MODEL_NAME, device=DEVICE)
+
+
+def _get(name: str, loader):
+    model = _models.get(name)
+    if model is None:
+        with _lock:
+            model = _models.get(name)
+            if model is None:
+                logger.info(f"Loading model '{name}'.")
+                model = loader()
+                _models[name] = model
+    return model
+
+
+def get_spacy_nlp():
+    return _get("spacy", _load_spacy)
+
+
+def get_sentiment_model():
+    return _get("sentiment", _load_sentiment_model)
+
+
+def get_embedding_model():
+    return _get("embedding", _load_embedding_model)
+
+
+def warm_up():
+    nlp = get_spacy_nlp()
+    tokenizer, sentiment_model = get_sentiment_model()
+    embedding_model = get_embedding_model()
+
+    for _ in nlp.pipe(WARM_UP_TEXTS):
+        pass
+    inputs = tokenizer(
+        WARM_UP_TEXTS, return_tensors="pt", truncation=True, padding=True, max_length=512
+    )
+    with torch.no_grad():
+        sentiment_model(**inputs)
+    embedding_model.encode(WARM_UP_TEXTS, device=DEVICE)
+
+    _ready.set()
+    logger.info("Models loaded and warmed up.")
+
+
+def is_ready() -> bool:
+    return _ready.is_set()
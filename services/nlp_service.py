@@ -3,36 +3,72 @@ from nltk.corpus import stopwords
 from nltk.stem import WordNetLemmatizer
 from nltk.tokenize import word_tokenize
 import re
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
 from sklearn.feature_extraction.text import TfidfVectorizer
 import torch
 import numpy as np
-from services.llm_service import get_cluster_name
+import os
+import logging
+from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor
+from services.llm_service import get_cluster_name, LLM_CONCURRENCY
+from services.model_registry import get_sentiment_model
+from services.analysis_context import AnalysisContext
+from services.cancellation_service import AnalysisCancelled, raise_if_cancelled, submit_with_token
 nltk.download("wordnet")
 
-model_name = "tabularisai/multilingual-sentiment-analysis"
-tokenizer = AutoTokenizer.from_pretrained(model_name)
-model = AutoModelForSequenceClassification.from_pretrained(model_name)
+load_dotenv()
+logger = logging.getLogger(__name__)
+SENTIMENT_TOKEN_BUDGET = int(os.getenv("SENTIMENT_TOKEN_BUDGET", "16384"))
+SENTIMENT_MAP = {
+    0: "Negative",
+    1: "Negative",
+    2: "Neutral",
+    3: "Positive",
+    4: "Positive",
+}
 
 
-def predict_sentiment(texts):
-    inputs = tokenizer(
-        texts, return_tensors="pt", truncation=True, padding=True, max_length=512
-    )
-    with torch.no_grad():
-        outputs = model(**inputs)
-    probabilities = torch.nn.functional.softmax(outputs.logits, dim=-1)
-    sentiment_map = {
-        0: "Negative",
-        1: "Negative",
-        2: "Neutral",
-        3: "Positive",
-        4: "Positive",
-    }
-    return [sentiment_map[p] for p in torch.argmax(probabilities, dim=-1).tolist()]
+def make_length_batches(lengths: list[int], token_budget: int) -> list[list[int]]:
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    batches = []
+    current: list[int] = []
 
+    for i in order:
+        if current and lengths[i] * (len(current) + 1) > token_budget:
+            batches.append(current)
+            current = []
+        current.append(i)
 
-def extract_cluster_keywords(texts, labels, top_n=10):
+    if current:
+        batches.append(current)
+    return batches
+
+
+def predict_sentiment(texts, token_budget: int = SENTIMENT_TOKEN_BUDGET):
+    if not texts:
+        return []
+
+    tokenizer, model = get_sentiment_model()
+    encodings = tokenizer(texts, truncation=True, max_length=512)
+    lengths = [len(input_ids) for input_ids in encodings["input_ids"]]
+    sentiments = [None] * len(texts)
+
+    for batch in make_length_batches(lengths, token_budget):
+        raise_if_cancelled()
+        inputs = tokenizer.pad(
+            {key: [encodings[key][i] for i in batch] for key in encodings},
+            return_tensors="pt",
+        )
+        with torch.no_grad():
+            outputs = model(**inputs)
+        predictions = torch.argmax(outputs.logits, dim=-1).tolist()
+        for i, prediction in zip(batch, predictions):
+            sentiments[i] = SENTIMENT_MAP[prediction]
+
+    return sentiments
+
+
+def compute_cluster_keywords(texts, labels, top_n=10):
     nltk.download("stopwords", quiet=True)
     cluster_keywords = {}
     stop_words = stopwords.words("english")
@@ -62,21 +98,49 @@ def extract_cluster_keywords(texts, labels, top_n=10):
         cluster_keywords[cluster_id] = [
             (terms[i], round(scores[i], 3)) for i in top_indices
         ]
+    return cluster_keywords
+
+
+def request_cluster_name(cluster_id, keyword_prompt: str, context: AnalysisContext | None = None) -> str:
+    try:
+        return get_cluster_name(keyword_prompt)
+    except AnalysisCancelled:
+        raise
+    except Exception:
+        logger.exception(f"Cluster naming failed for cluster {cluster_id}, using its keywords instead.")
+        if context is not None:
+            context.record_fallback(f"name of cluster {cluster_id}")
+        return keyword_prompt.title()
+
+
+def name_clusters(cluster_keywords: dict, context: AnalysisContext | None = None) -> dict:
     cluster_name_map = {}
-    for cluster_id, keywords in cluster_keywords.items():
-        if cluster_id == -1:
-            cluster_name_map[cluster_id] = "NOISE"
-            continue
+    futures = {}
+
+    with ThreadPoolExecutor(max_workers=LLM_CONCURRENCY) as executor:
+        for cluster_id, keywords in cluster_keywords.items():
+            if cluster_id == -1:
+                cluster_name_map[cluster_id] = "NOISE"
+                continue
 
-        keyword_prompt = " ".join([word for word, score in keywords[:3]])
+            keyword_prompt = " ".join([word for word, score in keywords[:3]])
 
-        if keyword_prompt:
-            cluster_name_map[cluster_id] = get_cluster_name(keyword_prompt)
-        else:
-            cluster_name_map[cluster_id] = f"Cluster {cluster_id}"
+            if keyword_prompt:
+                futures[cluster_id] = submit_with_token(executor, request_cluster_name, cluster_id, keyword_prompt, context)
+            else:
+                cluster_name_map[cluster_id] = f"Cluster {cluster_id}"
 
+        for cluster_id, future in futures.items():
+            cluster_name_map[cluster_id] = future.result()
+
+    return cluster_name_map
+
+
+def extract_cluster_keywords(texts, labels, top_n=10):
+    cluster_keywords = compute_cluster_keywords(texts, labels, top_n)
+    cluster_name_map = name_clusters(cluster_keywords)
     cluster_names_list = [cluster_name_map[label] for label in labels]
-    return cluster_keywords, cluster_names_list, texts
+    return cluster_keywords, cluster_names_list, np.array(texts)
 
 
 def process_text(text: str):
@@ -0,0 +1,120 @@
+from types import SimpleNamespace
+from pathlib import Path
+from dotenv import load_dotenv
+import logging
+import torch
+import os
+
+load_dotenv()
+SENTIMENT_ONNX_MIN_AGREEMENT = float(os.getenv("SENTIMENT_ONNX_MIN_AGREEMENT", "0.95"))
+# Exported models must label these like the torch model does before they are
+# used; the mix covers clear, mixed and neutral feedback.
+PARITY_TEXTS = [
+    "Support answered within an hour and fixed my billing issue",
+    "The app crashes every time I open the settings page",
+    "I love the new dashboard",
+    "The pricing is way too high for small teams",
+    "The update was released on Tuesday",
+    "Onboarding was smooth and the checklist kept us on track",
+    "Nobody followed up on my ticket for three days",
+    "We use it for sprint planning",
+    "The API is well documented and easy to integrate",
+    "Login takes forever and sync fails randomly",
+    "The invoice arrives at the start of each month",
+    "The support team was quick and helpful, but the pricing is too high.",
+]
+
+logger = logging.getLogger(__name__)
+
+
+class OnnxParityError(RuntimeError):
+    pass
+
+
+class OnnxSentimentModel:
+    def __init__(self, model_path: str):
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise RuntimeError(
+                "SENTIMENT_BACKEND=onnx requires the 'onnx' and 'onnxruntime' packages."
+            ) from e
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            model_path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = [model_input.name for model_input in self.session.get_inputs()]
+
+    def eval(self):
+        return self
+
+    def __call__(self, **inputs):
+        feed = {
+            name: inputs[name].cpu().numpy().astype("int64")
+            for name in self.input_names
+            if name in inputs
+        }
+        logits = self.session.run(["logits"], feed)[0]
+        return SimpleNamespace(logits=torch.from_numpy(logits))
+
+
+def export_onnx_model(model, sample_inputs: dict, output_path: str, quantize: bool = True) -> str:
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    input_names = list(sample_inputs.keys())
+    float_path = output_path.with_name(output_path.stem + ".fp32.onnx") if quantize else output_path
+
+    model.eval()
+    torch.onnx.export(
+        model,
+        (dict(sample_inputs),),
+        str(float_path),
+        input_names=input_names,
+        output_names=["logits"],
+        dynamic_axes={
+            **{name: {0: "batch", 1: "sequence"} for name in input_names},
+            "logits": {0: "batch"},
+        },
+        opset_version=17,
+        dynamo=False,
+    )
+
+    if quantize:
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+
+        quantize_dynamic(str(float_path), str(output_path), weight_type=QuantType.QInt8)
+        float_path.unlink()
+
+    logger.info(f"Exported sentiment model to {output_path} (quantized={quantize}).")
+    return str(output_path)
+
+
+def label_agreement(model, onnx_model: OnnxSentimentModel, inputs: dict) -> float:
+    with torch.no_grad():
+        expected = model(**inputs).logits.argmax(dim=-1)
+    actual = onnx_model(**inputs).logits.argmax(dim=-1)
+    return (expected == actual).float().mean().item()
+
+
+def load_onnx_sentiment_model(
+    model, tokenizer, output_path: str, quantize: bool = True, min_agreement: float = SENTIMENT_ONNX_MIN_AGREEMENT
+) -> OnnxSentimentModel:
+    if Path(output_path).exists():
+        return OnnxSentimentModel(output_path)
+
+    sample_inputs = dict(
+        tokenizer(PARITY_TEXTS, return_tensors="pt", truncation=True, padding=True, max_length=512)
+    )
+    export_onnx_model(model, sample_inputs, output_path, quantize=quantize)
+    onnx_model = OnnxSentimentModel(output_path)
+    agreement = label_agreement(model, onnx_model, sample_inputs)
+    logger.info(f"ONNX sentiment model agrees with torch on {agreement:.0%} of the parity sample.")
+    if agreement < min_agreement:
+        Path(output_path).unlink()
+        raise OnnxParityError(
+            f"Exported ONNX sentiment model agrees with torch on {agreement:.0%} of the parity sample, "
+            f"below SENTIMENT_ONNX_MIN_AGREEMENT={min_agreement:.0%}."
+        )
+    return onnx_model
@@ -0,0 +1,107 @@
+from dotenv import load_dotenv
+from pathlib import Path
+import threading
+import hashlib
+import sqlite3
+import zlib
+import json
+import time
+import os
+
+load_dotenv()
+RESULT_CACHE_PATH = os.getenv("RESULT_CACHE_PATH", ".cache/results/results.sqlite")
+RESULT_CACHE_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def json_default(value):
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+def make_result_key(content: bytes, filename: str, topics: str, columns: str, config: dict) -> str:
+    extension = (filename or "").rsplit(".", 1)[-1].lower()
+    payload = json.dumps([hashlib.sha256(content).hexdigest(), extension, topics, columns, config], sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    def __init__(self, path: str, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value BLOB, size INTEGER, last_used REAL)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)")
+        self.db.commit()
+
+    def get(self, key: str) -> dict | None:
+        with self.lock:
+            row = self.db.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.db.execute("UPDATE results SET last_used = ? WHERE key = ?", (time.time(), key))
+            self.db.commit()
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, key: str, result: dict):
+        value = zlib.compress(json.dumps(result, default=json_default).encode("utf-8"))
+        if len(value) > self.max_bytes:
+            return
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO results (key, value, size, last_used) VALUES (?, ?, ?, ?)",
+                (key, value, len(value), time.time()),
+            )
+            self.evict()
+            self.db.commit()
+
+    def evict(self):
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self.db.execute("SELECT key, size FROM results ORDER BY last_used").fetchall():
+            self.db.execute("DELETE FROM results WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def invalidate(self, key: str | None = None) -> int:
+        with self.lock:
+            if key is None:
+                removed = self.db.execute("DELETE FROM results").rowcount
+            else:
+                removed = self.db.execute("DELETE FROM results WHERE key = ?", (key,)).rowcount
+            self.db.commit()
+            return removed
+
+    def stats(self) -> dict:
+        with self.lock:
+            entries, bytes_stored = self.db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": entries,
+                "bytes_stored": bytes_stored,
+            }
+
+
+def get_result_cache() -> ResultCache | None:
+    global _cache
+    if RESULT_CACHE_MAX_BYTES <= 0:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResultCache(RESULT_CACHE_PATH, RESULT_CACHE_MAX_BYTES)
+        return _cache
@@ -1,12 +1,16 @@
 import re
-import spacy
+import os
+from dotenv import load_dotenv
+from services.model_registry import get_spacy_nlp
+from services.cancellation_service import raise_if_cancelled
 
-try:
-    nlp = spacy.load("en_core_web_sm")
-except OSError:
-    from spacy.cli import download
-    download("en_core_web_sm")
-    nlp = spacy.load("en_core_web_sm")
+load_dotenv()
+CHUNKING_BATCH_SIZE = int(os.getenv("CHUNKING_BATCH_SIZE", "256"))
+CHUNKING_N_PROCESS = int(os.getenv("CHUNKING_N_PROCESS", "1"))
+UNUSED_PIPES = ["ner", "lemmatizer"]
+SEGMENT_SEPARATORS = r"[.!?]\s+"
+SUBJECT_DEPS = ("nsubj", "nsubjpass", "expl")
+VERB_POS = ("VERB", "AUX")
 
 def clean_chunk(text: str) -> str:
     text = text.strip()
@@ -46,7 +50,11 @@ def is_valid_chunk(text: str) -> bool:
     return True
 
 def improved_sentence_split(text):
-    doc = nlp(text)
+    return split_doc(get_spacy_nlp()(text, disable=UNUSED_PIPES))
+
+def split_doc(doc):
+    text = doc.text
+    n = len(doc)
     split_indices = [0]
     hard_splitters = {
         "however", "nevertheless", "nonetheless", "conversely",
@@ -54,36 +62,50 @@ def improved_sentence_split(text):
         "accordingly", "consequently", "meanwhile", "furthermore",
         "moreover", "besides", "whereas", "although", "though", "yet"
     }
+    is_verb = [t.pos_ in VERB_POS for t in doc]
+    is_subj = [t.dep_ in SUBJECT_DEPS for t in doc]
+    verb_right = [False] * n
+    subj_right = [False] * n
+    for i in range(n - 2, -1, -1):
+        verb_right[i] = verb_right[i + 1] or is_verb[i + 1]
+        subj_right[i] = subj_right[i + 1] or is_subj[i + 1]
+    verb_prefix = [0] * (n + 1)
+    for i in range(n):
+        verb_prefix[i + 1] = verb_prefix[i] + is_verb[i]
+    text_end = doc[-1].idx + len(doc[-1].text) if n else 0
+
     for token in doc:
-        if token.text.lower() in hard_splitters:
+        lower = token.text.lower()
+        if lower in hard_splitters:
             split_indices.append(token.idx)
             continue
-        if token.text.lower() == "but":
+        if lower == "but":
             split_indices.append(token.idx)
             continue
-        if token.text.lower() == "and":
-            right_span = doc[token.i+1:]
-            has_subj = any(t.dep_ in ("nsubj", "nsubjpass", "expl") for t in right_span)
-            has_verb = any(t.pos_ in ("VERB", "AUX") for t in right_span)
+        if lower == "and":
+            has_subj = subj_right[token.i]
+            has_verb = verb_right[token.i]
             prev_token = doc[token.i - 1] if token.i > 0 else None
             if prev_token and prev_token.pos_ in ("NOUN", "PROPN", "ADJ") and \
-               len(right_span) > 0 and right_span[0].pos_ in ("NOUN", "PROPN", "ADJ") and not has_verb:
+               token.i + 1 < n and doc[token.i + 1].pos_ in ("NOUN", "PROPN", "ADJ") and not has_verb:
                 continue
             if has_subj and has_verb:
                 split_indices.append(token.idx)
             continue
         if token.text in [",", ";"]:
-            right_span = doc[token.i+1:]
-            left_span = doc[split_indices[-1]:token.i] if split_indices else doc[:token.i]
-            has_verb_right = any(t.pos_ in ("VERB", "AUX") for t in right_span)
-            has_verb_left = any(t.pos_ in ("VERB", "AUX") for t in left_span)
-            has_subj_right = any(t.dep_ in ("nsubj", "nsubjpass", "expl") for t in right_span)
+            # split_indices holds character offsets, but the left span has always
+            # been sliced with them as token indices; keep that for output parity.
+            left_start = min(split_indices[-1], n)
+            has_verb_right = verb_right[token.i]
+            has_verb_left = left_start < token.i and verb_prefix[token.i] > verb_prefix[left_start]
+            has_subj_right = subj_right[token.i]
             if has_subj_right and has_verb_right:
                 split_indices.append(token.idx + 1)
             elif not has_verb_left and not has_verb_right:
-                if len(doc[token.i+1:].text) > 10:
+                right_text_len = text_end - doc[token.i + 1].idx if token.i + 1 < n else 0
+                if right_text_len > 10:
                     split_indices.append(token.idx + 1)
-        if token.dep_ in ("nsubj", "nsubjpass", "expl"):
+        if is_subj[token.i]:
             if token.i > 0:
                 prev = doc[token.i - 1]
                 if prev.pos_ in ("VERB", "AUX", "NOUN", "ADJ", "ADV") and \
@@ -100,26 +122,40 @@ def improved_sentence_split(text):
             final_splits.append(cleaned)
     return final_splits
 
+def split_segments(text: str) -> list[str]:
+    return [seg for seg in re.split(SEGMENT_SEPARATORS, text) if seg.strip()]
+
 def test_chunks(text: str) -> list[str]:
-    separators = r"[.!?]\s+"
-    raw_segments = re.split(separators, text)
     results = []
 
-    for seg in raw_segments:
-
-        if not seg.strip():
-            continue
+    for seg in split_segments(text):
         results.extend(improved_sentence_split(seg))
 
     return results
 
-def feedback_chunking(feedback_list: list[str]):
+def feedback_chunking(
+    feedback_list: list[str],
+    batch_size: int = CHUNKING_BATCH_SIZE,
+    n_process: int = CHUNKING_N_PROCESS,
+):
+    segments = []
+    owners = []
+
+    for i, feedback in enumerate(feedback_list):
+        for seg in split_segments(feedback):
+            segments.append(seg)
+            owners.append(i)
+
     lst = []
-    number_list = []
+    number_list = [0] * len(feedback_list)
+    docs = get_spacy_nlp().pipe(
+        segments, batch_size=batch_size, n_process=n_process, disable=UNUSED_PIPES
+    )
 
-    for feedback in feedback_list:
-        text_chunks = test_chunks(feedback)
+    for owner, doc in zip(owners, docs):
+        raise_if_cancelled()
+        text_chunks = split_doc(doc)
         lst.extend(text_chunks)
-        number_list.append(len(text_chunks))
+        number_list[owner] += len(text_chunks)
 
     return lst, number_list
@@ -0,0 +1,73 @@
+from dotenv import load_dotenv
+from services.model_registry import get_embedding_model, EMBEDDING_MODEL_NAME
+from services.embedding_cache_service import encode_with_cache
+from services.llm_service import get_filtered_topics
+from services.cancellation_service import AnalysisCancelled
+import numpy as np
+import logging
+import re
+import os
+
+load_dotenv()
+DEVICE = os.getenv("DEVICE", "cpu")
+# "llm" asks filter_topics; "embedding" uses the local similarity filter below,
+# which stays opt-in until its threshold is tuned against recorded LLM
+# selections (benchmarks/eval_topic_filter.py --live).
+TOPIC_FILTER_MODE = os.getenv("TOPIC_FILTER_MODE", "llm")
+TOPIC_FILTER_THRESHOLD = float(os.getenv("TOPIC_FILTER_THRESHOLD", "0.45"))
+TOPIC_FILTER_MARGIN = float(os.getenv("TOPIC_FILTER_MARGIN", "0.05"))
+TOPIC_FILTER_LLM_TIEBREAK = os.getenv("TOPIC_FILTER_LLM_TIEBREAK", "false").lower() == "true"
+ALL_TOPICS_QUERIES = {"all", "everything", "all topics", "any"}
+
+logger = logging.getLogger(__name__)
+
+
+def split_requested_topics(selected_topics: str) -> list[str]:
+    return [topic.strip() for topic in re.split(r"[,;\n]", selected_topics) if topic.strip()]
+
+
+def topic_similarity(requested: list[str], cluster_names: list[str]) -> np.ndarray:
+    model = get_embedding_model()
+    vectors = np.asarray(encode_with_cache(model, EMBEDDING_MODEL_NAME, requested + cluster_names, DEVICE), dtype=np.float32)
+    vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    return vectors[len(requested):] @ vectors[: len(requested)].T
+
+
+def select_matching_topics(
+    selected_topics: str,
+    cluster_names: list[str],
+    threshold: float = TOPIC_FILTER_THRESHOLD,
+    margin: float = TOPIC_FILTER_MARGIN,
+    llm_tiebreak: bool = TOPIC_FILTER_LLM_TIEBREAK,
+) -> list[str]:
+    requested = split_requested_topics(selected_topics)
+    if not requested or not cluster_names:
+        return []
+    if any(topic.lower() in ALL_TOPICS_QUERIES for topic in requested):
+        return list(cluster_names)
+
+    lowered = {topic.lower() for topic in requested}
+    scores = dict(zip(cluster_names, topic_similarity(requested, cluster_names).max(axis=1)))
+    selected = {name for name in cluster_names if name.lower() in lowered or scores[name] >= threshold + margin}
+    borderline = [name for name in cluster_names if name not in selected and abs(scores[name] - threshold) < margin]
+    above_threshold = [name for name in borderline if scores[name] >= threshold]
+
+    if borderline and llm_tiebreak:
+        try:
+            chosen = set(get_filtered_topics(selected_topics, ", ".join(borderline)))
+            selected.update(name for name in borderline if name in chosen)
+        except AnalysisCancelled:
+            raise
+        except Exception:
+            logger.exception("LLM topic tie-breaker failed, using the similarity threshold.")
+            selected.update(above_threshold)
+    else:
+        selected.update(above_threshold)
+
+    return [name for name in cluster_names if name in selected]
+
+
+def filter_cluster_topics(selected_topics: str, cluster_names: list[str]) -> list[str]:
+    if TOPIC_FILTER_MODE == "embedding":
+        return select_matching_topics(selected_topics, cluster_names)
+    return get_filtered_topics(selected_topics=selected_topics, all_topics_list=", ".join(cluster_names))
@@ -0,0 +1,123 @@
+from dotenv import load_dotenv
+from services.llm_rate_limit_service import CHARS_PER_TOKEN
+import numpy as np
+import os
+
+load_dotenv()
+TOPIC_SUMMARY_TOKEN_BUDGET = int(os.getenv("TOPIC_SUMMARY_TOKEN_BUDGET", "3000"))
+TOPIC_SAMPLE_OUTLIER_SHARE = float(os.getenv("TOPIC_SAMPLE_OUTLIER_SHARE", "0.3"))
+NEAR_DUPLICATE_SIMILARITY = float(os.getenv("NEAR_DUPLICATE_SIMILARITY", "0.95"))
+REPRESENTATIVE_QUOTES = int(os.getenv("REPRESENTATIVE_QUOTES", "3"))
+
+
+def text_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def estimate_prompt_tokens(texts: list[str]) -> int:
+    return sum(text_tokens(text) for text in texts)
+
+
+def take_within_budget(texts: list[str], token_budget: int) -> list[str]:
+    selected = []
+    used = 0
+    for text in dict.fromkeys(texts):
+        cost = text_tokens(text)
+        if used + cost <= token_budget:
+            selected.append(text)
+            used += cost
+    return selected
+
+
+def unit_vectors(embeddings: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(embeddings, dtype=np.float32)
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+def centroid_similarity(vectors: np.ndarray) -> np.ndarray:
+    centroid = vectors.mean(axis=0)
+    return vectors @ (centroid / max(np.linalg.norm(centroid), 1e-12))
+
+
+def select_representative_quotes(
+    texts: list[str],
+    embeddings: np.ndarray | None = None,
+    k: int = REPRESENTATIVE_QUOTES,
+    duplicate_similarity: float = NEAR_DUPLICATE_SIMILARITY,
+) -> list[str]:
+    if embeddings is None or len(embeddings) != len(texts):
+        return list(dict.fromkeys(texts))[:k]
+
+    vectors = unit_vectors(embeddings)
+    quotes: list[int] = []
+    for i in np.argsort(-centroid_similarity(vectors), kind="stable"):
+        if len(quotes) == k:
+            break
+        if not quotes or (vectors[quotes] @ vectors[i]).max() < duplicate_similarity:
+            quotes.append(i)
+    return [texts[i] for i in quotes]
+
+
+def select_representative_texts(
+    texts: list[str],
+    embeddings: np.ndarray | None = None,
+    token_budget: int = TOPIC_SUMMARY_TOKEN_BUDGET,
+    outlier_share: float = TOPIC_SAMPLE_OUTLIER_SHARE,
+    duplicate_similarity: float = NEAR_DUPLICATE_SIMILARITY,
+) -> list[str]:
+    if not texts:
+        return []
+    if embeddings is None or len(embeddings) != len(texts):
+        return take_within_budget(texts, token_budget)
+
+    vectors = unit_vectors(embeddings)
+    similarity = centroid_similarity(vectors)
+    costs = np.array([text_tokens(text) for text in texts])
+
+    # Highest similarity of every text to anything already selected; texts
+    # above duplicate_similarity are treated as near-duplicates and skipped.
+    closest = np.full(len(texts), -np.inf, dtype=np.float32)
+    selected: list[int] = []
+    used = 0
+
+    def add(i: int):
+        nonlocal used
+        selected.append(i)
+        used += costs[i]
+        np.maximum(closest, vectors @ vectors[i], out=closest)
+        closest[i] = np.inf
+
+    medoid_budget = token_budget * (1 - outlier_share)
+    for i in np.argsort(-similarity):
+        if closest[i] < duplicate_similarity and used + costs[i] <= medoid_budget:
+            add(i)
+
+    # Farthest-first traversal from the central texts picks diverse outliers.
+    rejected = np.zeros(len(texts), dtype=bool)
+    while True:
+        candidates = np.where(rejected, np.inf, closest)
+        i = int(np.argmin(candidates))
+        if candidates[i] >= duplicate_similarity:
+            break
+        if used + costs[i] <= token_budget:
+            add(i)
+        else:
+            rejected[i] = True
+
+    if not selected:
+        central = texts[int(np.argmax(similarity))]
+        return [central[: token_budget * CHARS_PER_TOKEN]]
+    return [texts[i] for i in selected]
+
+
+def pack_topic_samples(samples: dict[str, list[str]], token_budget: int) -> list[dict[str, list[str]]]:
+    batches: list[dict[str, list[str]]] = []
+    used = 0
+    for topic, texts in samples.items():
+        cost = estimate_prompt_tokens(texts) + text_tokens(topic)
+        if not batches or used + cost > token_budget:
+            batches.append({})
+            used = 0
+        batches[-1][topic] = texts
+        used += cost
+    return batches
@@ -0,0 +1,107 @@
+import asyncio
+import unittest
+
+from services.admission_service import (
+    AdmissionController,
+    AdmissionRejected,
+    estimate_analysis_memory,
+    ANALYSIS_MEMORY_PER_UPLOAD_BYTE,
+)
+
+
+class TestAdmissionService(unittest.TestCase):
+    def test_rejects_when_slots_and_queue_are_full(self):
+        async def scenario():
+            controller = AdmissionController(max_concurrent=1, max_queued=1, memory_budget=0, retry_after=7)
+            release = asyncio.Event()
+            order = []
+
+            async def analysis(name):
+                async with controller.admit():
+                    order.append(name)
+                    await release.wait()
+
+            running = asyncio.create_task(analysis("first"))
+            await asyncio.sleep(0)
+            waiting = asyncio.create_task(analysis("second"))
+            await asyncio.sleep(0)
+            self.assertEqual(controller.stats()["waiting"], 1)
+
+            with self.assertRaises(AdmissionRejected) as raised:
+                await controller.acquire()
+            self.assertEqual(raised.exception.retry_after, 7)
+
+            release.set()
+            await asyncio.gather(running, waiting)
+            return controller, order
+
+        controller, order = asyncio.run(scenario())
+        self.assertEqual(order, ["first", "second"])
+        self.assertEqual((controller.active, controller.waiting, controller.memory_in_use), (0, 0, 0))
+
+    def test_jobs_wait_instead_of_being_rejected(self):
+        async def scenario():
+            controller = AdmissionController(max_concurrent=1, max_queued=0, memory_budget=0)
+            await controller.acquire()
+            waiter = asyncio.create_task(controller.acquire(reject_when_full=False))
+            await asyncio.sleep(0)
+            self.assertFalse(waiter.done())
+            await controller.release()
+            await waiter
+            return controller
+
+        self.assertEqual(asyncio.run(scenario()).active, 1)
+
+    def test_memory_budget_limits_concurrent_cost(self):
+        async def scenario():
+            controller = AdmissionController(max_concurrent=4, max_queued=4, memory_budget=100)
+            await controller.acquire(60)
+            small = asyncio.create_task(controller.acquire(30))
+            large = asyncio.create_task(controller.acquire(50))
+            await asyncio.sleep(0)
+            self.assertTrue(small.done())
+            self.assertFalse(large.done())
+            await controller.release(60)
+            await large
+            return controller
+
+        controller = asyncio.run(scenario())
+        self.assertEqual(controller.memory_in_use, 80)
+
+    def test_large_waiting_analysis_is_not_overtaken(self):
+        async def scenario():
+            controller = AdmissionController(max_concurrent=4, max_queued=4, memory_budget=100)
+            await controller.acquire(60)
+            large = asyncio.create_task(controller.acquire(500))
+            await asyncio.sleep(0)
+            small = asyncio.create_task(controller.acquire(10))
+            await asyncio.sleep(0)
+            self.assertFalse(large.done())
+            self.assertFalse(small.done())
+
+            await controller.release(60)
+            await large
+            await asyncio.sleep(0)
+            self.assertFalse(small.done())
+
+            await controller.release(500)
+            await small
+            return controller
+
+        self.assertEqual(asyncio.run(scenario()).memory_in_use, 10)
+
+    def test_oversized_analysis_runs_alone(self):
+        async def scenario():
+            controller = AdmissionController(max_concurrent=2, max_queued=2, memory_budget=10)
+            await controller.acquire(500)
+            return controller
+
+        self.assertEqual(asyncio.run(scenario()).active, 1)
+
+    def test_memory_estimate_scales_with_upload_size(self):
+        content = b"Text\n" + b"a much longer piece of feedback\n" * 3
+        self.assertEqual(estimate_analysis_memory(content), len(content) * ANALYSIS_MEMORY_PER_UPLOAD_BYTE)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,202 @@
+import asyncio
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+from fastapi import HTTPException, UploadFile
+
+os.environ.setdefault("GEMINI_API_KEY", "test")
+os.environ.setdefault("CEREBRAS_API_KEY", "test")
+
+from models.models import SentimentResponse
+from services import analysis_service
+from services.result_cache_service import ResultCache
+from services.cancellation_service import AnalysisCancelled, CancellationToken, raise_if_cancelled
+
+
+async def fake_dataset(context, file, get_separator, topics, columns, validate):
+    return ["Great support, too expensive"], None
+
+
+def fake_chunking(context, topics):
+    return ["Great support", "too expensive"], [2]
+
+
+def fake_clusters(context, texts, topics):
+    responses = [
+        SentimentResponse(text="Great support", topic="Support", sentiment="Positive"),
+        SentimentResponse(text="too expensive", topic="Pricing", sentiment="Negative"),
+    ]
+    phrase_clusters = [{"x": 0.0, "y": 0.0, "cluster": item.topic, "phrase": item.text} for item in responses]
+    return phrase_clusters, responses, ""
+
+
+class TestAnalysisStream(unittest.TestCase):
+    def setUp(self):
+        patches = [
+            patch.object(analysis_service, "get_dataset_from_file", fake_dataset),
+            patch.object(analysis_service, "feedback_list_analysis", fake_chunking),
+            patch.object(analysis_service, "cluster_texts", fake_clusters),
+            patch.object(analysis_service, "topics_analysis", lambda context, feedback: [{"topic": "Support", "count": 1, "summary": "ok"}]),
+            patch.object(analysis_service, "get_total_summary", lambda topics: "Overall fine."),
+            patch.object(analysis_service, "get_result_cache", return_value=None),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def upload(self, filename: str = "feedback.csv") -> UploadFile:
+        return UploadFile(file=io.BytesIO(b"Text\nGreat support, too expensive"), filename=filename)
+
+    def collect(self, topics: str = "") -> list[dict]:
+        async def scenario():
+            return [json.loads(line) async for line in analysis_service.analysis_stream(self.upload(), topics)]
+
+        return asyncio.run(scenario())
+
+    def test_stages_are_streamed_in_order_with_early_partials(self):
+        events = self.collect()
+
+        self.assertEqual([event["event"] for event in events], ["dataset", "clusters", "topics", "summary", "done"])
+        self.assertEqual(events[1]["data"]["sentiment"], {"positive": 1, "negative": 1, "neutral": 0})
+        self.assertEqual(len(events[1]["data"]["phrase_clusters"]), 2)
+        self.assertEqual(events[3]["data"], {"summary": "Overall fine."})
+
+    def test_streamed_partials_match_blocking_analysis(self):
+        merged = {}
+        for event in self.collect():
+            merged.update(event["data"])
+
+        self.assertEqual(merged, json.loads(json.dumps(asyncio.run(analysis_service.analysis(self.upload())))))
+
+    def test_failure_is_reported_as_error_event(self):
+        async def bad_dataset(*args):
+            raise HTTPException(status_code=400, detail="Empty TXT file.")
+
+        with patch.object(analysis_service, "get_dataset_from_file", bad_dataset):
+            events = self.collect()
+
+        self.assertEqual(events, [{"event": "error", "data": {"status_code": 400, "detail": "Empty TXT file."}}])
+
+    def test_cancelled_analysis_stops_at_the_next_stage(self):
+        token = CancellationToken()
+
+        def cancelling_clusters(*args):
+            token.cancel()
+            return fake_clusters(*args)
+
+        with (
+            patch.object(analysis_service, "cluster_texts", cancelling_clusters),
+            patch.object(analysis_service, "topics_analysis", side_effect=AssertionError("topics ran")),
+        ):
+            with self.assertRaises(AnalysisCancelled):
+                asyncio.run(analysis_service.analysis(self.upload(), cancellation=token))
+
+        self.assertEqual(analysis_service.error_payload(AnalysisCancelled())["status_code"], 499)
+
+    def test_cancelled_stream_reports_cancellation_and_stops(self):
+        token = CancellationToken()
+
+        def cancelling_clusters(*args):
+            token.cancel()
+            return fake_clusters(*args)
+
+        async def scenario():
+            stream = analysis_service.analysis_stream(self.upload(), cancellation=token)
+            return [json.loads(line) async for line in stream]
+
+        with patch.object(analysis_service, "cluster_texts", cancelling_clusters):
+            events = asyncio.run(scenario())
+
+        self.assertEqual([event["event"] for event in events], ["dataset", "clusters", "error"])
+        self.assertEqual(events[-1]["data"]["status_code"], 499)
+
+    def test_cancelling_the_request_task_stops_worker_threads(self):
+        started, stopped = threading.Event(), threading.Event()
+
+        def slow_chunking(context, topics):
+            started.set()
+            try:
+                while True:
+                    raise_if_cancelled()
+                    time.sleep(0.01)
+            finally:
+                stopped.set()
+
+        async def scenario():
+            task = asyncio.create_task(analysis_service.analysis(self.upload()))
+            await asyncio.to_thread(started.wait, 5)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        with patch.object(analysis_service, "feedback_list_analysis", slow_chunking):
+            asyncio.run(scenario())
+        self.assertTrue(stopped.wait(5))
+
+
+class TestResultCache(TestAnalysisStream):
+    def setUp(self):
+        super().setUp()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.cache = ResultCache(str(Path(tmp.name) / "results.sqlite"), max_bytes=1 << 20)
+        patcher = patch.object(analysis_service, "get_result_cache", return_value=self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_repeated_upload_is_served_from_cache(self):
+        first = asyncio.run(analysis_service.analysis(self.upload()))
+        with patch.object(analysis_service, "cluster_texts", side_effect=AssertionError("pipeline re-ran")):
+            second = asyncio.run(analysis_service.analysis(self.upload("renamed.csv")))
+            events = self.collect()
+
+        self.assertEqual({**first, "filename": "renamed.csv"}, second)
+        self.assertEqual([event["event"] for event in events], ["dataset", "clusters", "topics", "summary", "done"])
+        self.assertEqual(self.cache.stats()["hits"], 2)
+        self.assertGreater(self.cache.stats()["bytes_stored"], 0)
+
+    def test_degraded_results_are_not_cached(self):
+        def degraded_topics(context, feedback):
+            context.record_fallback("topic 'Support'")
+            return [{"topic": "Support", "count": 1, "summary": "Topic summary unavailable."}]
+
+        with patch.object(analysis_service, "topics_analysis", degraded_topics):
+            asyncio.run(analysis_service.analysis(self.upload()))
+            self.collect()
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+        asyncio.run(analysis_service.analysis(self.upload()))
+        self.assertEqual(self.cache.stats()["entries"], 1)
+
+    def test_output_affecting_settings_change_the_key(self):
+        base = asyncio.run(analysis_service.result_cache_key(self.upload(), "", ""))
+        for setting, value in [
+            ("K_SELECTION_N_JOBS", 1),
+            ("REPRESENTATIVE_QUOTES", 5),
+            ("NEAR_DUPLICATE_SIMILARITY", 0.9),
+            ("TOPIC_SAMPLE_OUTLIER_SHARE", 0.5),
+            ("TOPIC_BATCH_TOKEN_BUDGET", 1000),
+            ("TOPIC_FILTER_MARGIN", 0.1),
+            ("TOPIC_FILTER_LLM_TIEBREAK", True),
+        ]:
+            with self.subTest(setting=setting), patch.object(analysis_service, setting, value):
+                self.assertNotEqual(asyncio.run(analysis_service.result_cache_key(self.upload(), "", "")), base)
+
+    def test_topics_and_invalidation_change_the_key(self):
+        asyncio.run(analysis_service.analysis(self.upload()))
+        asyncio.run(analysis_service.analysis(self.upload(), topics="pricing"))
+        self.assertEqual(self.cache.stats()["entries"], 2)
+
+        self.assertEqual(self.cache.invalidate(), 2)
+        asyncio.run(analysis_service.analysis(self.upload()))
+        self.assertEqual(self.cache.stats()["hits"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
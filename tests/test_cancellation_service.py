@@ -0,0 +1,94 @@
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+from joblib import parallel_backend
+import numpy as np
+
+from services.cancellation_service import (
+    AnalysisCancelled,
+    CancellationToken,
+    cancellable_sleep,
+    raise_if_cancelled,
+    run_with_token,
+    submit_with_token,
+)
+from services.k_selection_service import select_k
+from services.llm_router_service import ProviderRouter
+
+
+class TestCancellationService(unittest.TestCase):
+    def test_token_is_visible_in_executor_threads(self):
+        token = CancellationToken()
+
+        def fan_out():
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                token.cancel()
+                return submit_with_token(executor, raise_if_cancelled).result()
+
+        with self.assertRaises(AnalysisCancelled):
+            run_with_token(token, fan_out)
+
+    def test_checks_are_noops_without_a_token(self):
+        raise_if_cancelled()
+        cancellable_sleep(0)
+
+    def test_sleep_wakes_up_when_cancelled(self):
+        token = CancellationToken()
+        threading.Timer(0.05, token.cancel).start()
+        started = time.monotonic()
+        with self.assertRaises(AnalysisCancelled):
+            run_with_token(token, cancellable_sleep, 10)
+        self.assertLess(time.monotonic() - started, 2)
+
+    def test_k_sweep_stops_between_candidates(self):
+        token = CancellationToken()
+        fitted = []
+
+        def fit_k(points, k, sample_size, init=None):
+            fitted.append(k)
+            token.cancel()
+            return {}, np.zeros((k, points.shape[1]))
+
+        points = np.random.default_rng(0).normal(size=(100, 2))
+        with patch("services.k_selection_service.fit_k", fit_k):
+            with self.assertRaises(AnalysisCancelled):
+                run_with_token(token, select_k, points, 100, 1)
+        self.assertEqual(fitted, [2])
+
+    def test_parallel_k_sweep_stops_between_candidates(self):
+        token = CancellationToken()
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        def fit_k(points, k, sample_size, init=None):
+            if k == 2:
+                token.cancel()
+            else:
+                release.wait(10)
+            return {}, np.zeros((k, points.shape[1]))
+
+        points = np.random.default_rng(0).normal(size=(400, 2))
+        started = time.monotonic()
+        # Threads instead of processes so the patched fit_k can reach the token.
+        with patch("services.k_selection_service.fit_k", fit_k), parallel_backend("threading"):
+            with self.assertRaises(AnalysisCancelled):
+                run_with_token(token, select_k, points, 100)
+        self.assertLess(time.monotonic() - started, 5)
+
+    def test_router_abandons_pending_provider_call(self):
+        token = CancellationToken()
+        release = threading.Event()
+        router = ProviderRouter(hedge_enabled=False, max_workers=2)
+        threading.Timer(0.05, token.cancel).start()
+
+        started = time.monotonic()
+        with self.assertRaises(AnalysisCancelled):
+            run_with_token(token, router.call, [("gemini", lambda: release.wait(10))])
+        self.assertLess(time.monotonic() - started, 2)
+        release.set()
+
+
+if __name__ == "__main__":
+    unittest.main()
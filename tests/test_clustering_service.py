@@ -0,0 +1,93 @@
+import os
+import unittest
+from unittest.mock import patch
+import numpy as np
+from sklearn.datasets import make_blobs
+
+os.environ.setdefault("GEMINI_API_KEY", "test")
+os.environ.setdefault("CEREBRAS_API_KEY", "test")
+
+from services import clustering_service
+from services.analysis_context import AnalysisContext
+from sklearn.metrics.pairwise import cosine_distances
+from services.clustering_service import cluster_texts, cluster_distance_metrics
+from services.k_selection_service import select_k
+
+
+class FakeEncoder:
+    def __init__(self, vectors: np.ndarray):
+        self.vectors = vectors
+
+    def encode(self, texts, device="cpu"):
+        return self.vectors[: len(texts)]
+
+
+def fake_keywords(texts, labels, top_n=10):
+    return {label: [] for label in np.unique(labels)}
+
+
+def fake_names(cluster_keywords, context=None):
+    return {cluster_id: f"Topic {cluster_id}" for cluster_id in cluster_keywords}
+
+
+class TestClusteringService(unittest.TestCase):
+    def setUp(self):
+        vectors, _ = make_blobs(n_samples=120, n_features=16, centers=4, random_state=5)
+        self.texts = [f"feedback {i}" for i in range(len(vectors))]
+        patches = [
+            patch.object(clustering_service, "get_embedding_model", return_value=FakeEncoder(vectors)),
+            patch.object(clustering_service, "encode_with_cache", lambda model, name, texts, device: model.encode(texts)),
+            patch.object(clustering_service, "predict_sentiment", lambda texts: ["Neutral"] * len(texts)),
+            patch.object(clustering_service, "compute_cluster_keywords", fake_keywords),
+            patch.object(clustering_service, "name_clusters", fake_names),
+            patch.object(clustering_service, "filter_cluster_topics", return_value=["Topic 0"]),
+            patch.object(clustering_service, "select_k", lambda points: select_k(points, n_jobs=1)),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_expensive_stages_run_once(self):
+        context = AnalysisContext()
+        with patch.object(clustering_service, "TSNE", wraps=clustering_service.TSNE) as tsne, \
+             patch.object(clustering_service, "UMAP", wraps=clustering_service.UMAP) as umap, \
+             patch.object(clustering_service, "AgglomerativeClustering", wraps=clustering_service.AgglomerativeClustering) as ward:
+            phrase_clusters, responses, info = cluster_texts(context, self.texts)
+
+        self.assertEqual((tsne.call_count, umap.call_count, ward.call_count), (1, 1, 1))
+        for stage in ("embedding", "umap", "tsne", "k_selection", "ward", "keywords", "cluster_naming"):
+            self.assertEqual(len(context.stage_timings[stage]), 1, stage)
+        self.assertEqual(len(phrase_clusters), len(self.texts))
+        self.assertEqual(len(responses), len(self.texts))
+        self.assertIn("Silhouette", info)
+
+    def test_topic_filter_keeps_only_matching_clusters(self):
+        context = AnalysisContext()
+        phrase_clusters, responses, _ = cluster_texts(context, self.texts, topics="first topic")
+
+        self.assertTrue(phrase_clusters)
+        self.assertTrue(all(item["cluster"] == "Topic 0" for item in phrase_clusters))
+        self.assertEqual(len(context.results_df), len(responses))
+
+
+class TestClusterDistanceMetrics(unittest.TestCase):
+    def test_matches_pairwise_distance_matrices(self):
+        rng = np.random.default_rng(0)
+        embeddings = rng.standard_normal((400, 24)).astype(np.float32)
+        labels = np.concatenate([rng.integers(0, 6, 399), [6]])
+
+        intra, inter = cluster_distance_metrics(embeddings, labels, 7)
+
+        expected_intra = np.mean(
+            [cosine_distances(embeddings[labels == i]).mean() for i in range(7)]
+        )
+        centroids = [embeddings[labels == i].mean(axis=0).reshape(1, -1) for i in range(7)]
+        expected_inter = np.mean(
+            [cosine_distances(centroids[i], centroids[j]) for i in range(7) for j in range(i + 1, 7)]
+        )
+        self.assertAlmostEqual(intra, expected_intra, places=5)
+        self.assertAlmostEqual(inter, expected_inter, places=5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+from unittest.mock import MagicMock
+from services.delimiter_service import detect_separator, sniff_delimiter
+
+
+class TestDelimiterService(unittest.TestCase):
+    def test_detects_common_separators(self):
+        for separator in [",", ";", "\t", "|"]:
+            lines = [separator.join(["Text", "Rating", "Date"])] + [
+                separator.join([f"feedback {i}", str(i % 5), "2024-01-01"]) for i in range(20)
+            ]
+            self.assertEqual(sniff_delimiter(lines), (separator, 1.0), repr(separator))
+
+    def test_separators_inside_quotes_are_ignored(self):
+        lines = ["Text,Rating"] + [f'"Great app, fast; and cheap, {i}",5' for i in range(20)]
+        self.assertEqual(sniff_delimiter(lines), (",", 1.0))
+
+    def test_plain_feedback_lines_are_not_delimited(self):
+        lines = [
+            "The app is great",
+            "Support was slow, but helpful, and friendly",
+            "Too expensive for what it offers",
+            "I like the new design; colors are nice",
+            "Crashes every time I open settings",
+        ]
+        separator, confidence = sniff_delimiter(lines)
+        self.assertEqual(separator, "null")
+        self.assertGreaterEqual(confidence, 0.5)
+
+    def test_low_confidence_falls_back_to_llm(self):
+        lines = ["Great app, love it", "Slow, buggy", "Nice design, clean", "ok"]
+        get_separator = MagicMock(return_value="null")
+
+        self.assertEqual(detect_separator(lines, get_separator), "null")
+        get_separator.assert_called_once_with("Great app, love it")
+
+    def test_confident_guess_skips_llm(self):
+        lines = ["Text;Rating"] + [f"feedback {i};{i}" for i in range(10)]
+        get_separator = MagicMock()
+
+        self.assertEqual(detect_separator(lines, get_separator), ";")
+        get_separator.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
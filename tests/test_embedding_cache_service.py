@@ -0,0 +1,74 @@
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+from services import embedding_cache_service
+from services.embedding_cache_service import EmbeddingCache, encode_with_cache
+
+
+class FakeEncoder:
+    def __init__(self, dim: int = 8):
+        self.dim = dim
+        self.encoded: list[str] = []
+
+    def get_sentence_embedding_dimension(self):
+        return self.dim
+
+    def encode(self, texts, device="cpu"):
+        self.encoded.extend(texts)
+        return np.array(
+            [np.random.default_rng(sum(map(ord, text))).standard_normal(self.dim) for text in texts],
+            dtype=np.float32,
+        )
+
+
+class TestEmbeddingCacheService(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        patcher = patch.multiple(
+            embedding_cache_service, EMBEDDING_CACHE_DIR=self.tmp.name, _caches={}
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_only_cache_misses_are_encoded(self):
+        model = FakeEncoder()
+        first = encode_with_cache(model, "fake-model", ["Too expensive", "Great support"], "cpu")
+        model.encoded.clear()
+
+        second = encode_with_cache(
+            model, "fake-model", ["Great  support ", "Slow app", "Too expensive", "Slow app"], "cpu"
+        )
+
+        self.assertEqual(model.encoded, ["Slow app"])
+        self.assertEqual(second.shape, (4, 8))
+        np.testing.assert_array_equal(second[0], first[1])
+        np.testing.assert_array_equal(second[2], first[0])
+        np.testing.assert_array_equal(second[1], second[3])
+
+    def test_entries_survive_reopening(self):
+        cache = EmbeddingCache(self.tmp.name, "fake-model", 4, max_bytes=1024)
+        cache.put_many(["a text"], np.ones((1, 4), dtype=np.float32))
+
+        reopened = EmbeddingCache(self.tmp.name, "fake-model", 4, max_bytes=1024)
+        self.assertEqual(reopened.get_many(["a text"])[0].tolist(), [1.0] * 4)
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = EmbeddingCache(self.tmp.name, "fake-model", 4, max_bytes=3 * 4 * 2)
+        for i, text in enumerate(["one", "two", "three"]):
+            cache.put_many([text], np.arange(4 * i, 4 * i + 4, dtype=np.float32).reshape(1, 4))
+        cache.get_many(["one"])
+
+        cache.put_many(["four"], np.full((1, 4), 9, dtype=np.float32))
+
+        one, two, three, four = cache.get_many(["one", "two", "three", "four"])
+        self.assertIsNone(two)
+        self.assertEqual(one.tolist(), [0.0, 1.0, 2.0, 3.0])
+        self.assertEqual(three.tolist(), [8.0, 9.0, 10.0, 11.0])
+        self.assertEqual(four.tolist(), [9.0] * 4)
+        self.assertLessEqual(cache.capacity, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import asyncio
+import io
+import threading
+import time
+import unittest
+from fastapi import UploadFile
+from models.models import DatasetQuality, SentimentResponse
+from services.analysis_context import AnalysisContext
+from services.cancellation_service import AnalysisCancelled, cancellable_sleep
+from services.file_handler_service import (
+    get_dataset_from_file,
+    get_feedback_list,
+    create_dataset_from_sentiment_response_list,
+    get_feedback_analysis_by_topic,
+)
+
+
+def make_upload(texts: list[str]) -> UploadFile:
+    content = "Text,Rating\n" + "\n".join(f"{text},5" for text in texts)
+    return UploadFile(file=io.BytesIO(content.encode("utf-8")), filename="feedback.csv")
+
+
+def valid_dataset(text_sample, rating_sample):
+    return DatasetQuality(is_valid=True, reason="ok")
+
+
+class TestFileHandlerService(unittest.TestCase):
+    def test_contexts_are_isolated(self):
+        first = AnalysisContext()
+        second = AnalysisContext()
+        asyncio.run(
+            get_dataset_from_file(
+                first, make_upload([f"first {i}" for i in range(30)]), None, "", "", valid_dataset
+            )
+        )
+        asyncio.run(
+            get_dataset_from_file(
+                second, make_upload([f"second {i}" for i in range(40)]), None, "", "", valid_dataset
+            )
+        )
+
+        self.assertEqual(len(get_feedback_list(first)), 30)
+        self.assertEqual(len(get_feedback_list(second)), 40)
+        self.assertTrue(all(text.startswith("first") for text in get_feedback_list(first)))
+
+    def test_txt_separator_is_sniffed_without_llm(self):
+        content = "Text;Rating\n" + "\n".join(f"feedback {i};4" for i in range(30))
+        upload = UploadFile(file=io.BytesIO(content.encode("utf-8")), filename="feedback.txt")
+        context = AnalysisContext()
+
+        def no_llm(row):
+            raise AssertionError("get_separator should not be called")
+
+        asyncio.run(get_dataset_from_file(context, upload, no_llm, "", "", valid_dataset))
+
+        self.assertEqual(len(get_feedback_list(context)), 30)
+
+    def test_ingest_llm_calls_do_not_block_the_event_loop(self):
+        loop_ran = threading.Event()
+
+        def slow_validation(text_sample, rating_sample):
+            # Only returns if the loop can run the ticker below meanwhile.
+            self.assertTrue(loop_ran.wait(5))
+            return valid_dataset(text_sample, rating_sample)
+
+        async def ticker():
+            await asyncio.sleep(0.01)
+            loop_ran.set()
+
+        async def scenario():
+            upload = make_upload([f"feedback {i}" for i in range(30)])
+            await asyncio.gather(
+                get_dataset_from_file(AnalysisContext(), upload, None, "", "", slow_validation), ticker()
+            )
+
+        asyncio.run(scenario())
+
+    def test_cancellation_stops_ingest_llm_calls(self):
+        context = AnalysisContext()
+        threading.Timer(0.05, context.cancellation.cancel).start()
+
+        def stuck_validation(text_sample, rating_sample):
+            # Stands in for a throttle wait or retry backoff.
+            cancellable_sleep(10)
+            return valid_dataset(text_sample, rating_sample)
+
+        started = time.monotonic()
+        with self.assertRaises(AnalysisCancelled):
+            asyncio.run(
+                get_dataset_from_file(
+                    context, make_upload([f"feedback {i}" for i in range(30)]), None, "", "", stuck_validation
+                )
+            )
+        self.assertLess(time.monotonic() - started, 2)
+
+    def test_release_drops_results(self):
+        context = AnalysisContext()
+        create_dataset_from_sentiment_response_list(
+            context,
+            [
+                SentimentResponse(text="Too expensive", topic="Pricing", sentiment="Negative"),
+                SentimentResponse(text="Fast support", topic="Support", sentiment="Positive"),
+            ],
+        )
+        self.assertEqual(get_feedback_analysis_by_topic(context, "Pricing"), ["Too expensive"])
+
+        context.release()
+
+        self.assertTrue(context.results_df.empty)
+        self.assertEqual(context.embeddings.size, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
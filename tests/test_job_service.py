@@ -0,0 +1,76 @@
+import asyncio
+import os
+import unittest
+from unittest.mock import patch
+from fastapi import HTTPException
+
+os.environ.setdefault("GEMINI_API_KEY", "test")
+os.environ.setdefault("CEREBRAS_API_KEY", "test")
+
+from services.job_service import JobManager, STAGE_PROGRESS
+
+
+class TestJobService(unittest.TestCase):
+    def run_jobs(self, runner, submissions: int, **kwargs):
+        async def scenario():
+            manager = JobManager(runner, **kwargs)
+            manager.start()
+            jobs = [manager.submit(f"file{i}.csv", b"Text\nhello", "", "") for i in range(submissions)]
+            await manager.queue.join()
+            await manager.stop()
+            return manager, jobs
+
+        return asyncio.run(scenario())
+
+    def test_job_reports_stages_and_keeps_result(self):
+        seen = []
+
+        async def runner(upload, topics, columns, on_stage):
+            on_stage("sentiment")
+            seen.append(await upload.read())
+            on_stage("topics")
+            return {"filename": upload.filename}
+
+        manager, (job,) = self.run_jobs(runner, 1)
+
+        self.assertEqual(seen, [b"Text\nhello"])
+        self.assertEqual(job.status_payload(), {"job_id": job.id, "status": "done", "stage": "done", "percent": 100})
+        self.assertEqual(manager.get(job.id).result, {"filename": "file0.csv"})
+
+    def test_stage_progress_never_goes_backwards(self):
+        async def runner(upload, topics, columns, on_stage):
+            on_stage("topics")
+            on_stage("embedding")
+            raise HTTPException(status_code=400, detail="bad file")
+
+        _, (job,) = self.run_jobs(runner, 1)
+
+        self.assertEqual(job.percent, STAGE_PROGRESS["topics"])
+        self.assertEqual(job.status, "failed")
+        self.assertEqual(job.error, {"status_code": 400, "detail": "bad file"})
+
+    def test_queue_is_bounded(self):
+        async def scenario():
+            manager = JobManager(None, queue_size=2)
+            manager.start()
+            manager.submit("a.csv", b"", "", "")
+            manager.submit("b.csv", b"", "", "")
+            with self.assertRaises(asyncio.QueueFull):
+                manager.submit("c.csv", b"", "", "")
+            await manager.stop()
+
+        asyncio.run(scenario())
+
+    def test_finished_jobs_expire_after_ttl(self):
+        async def runner(upload, topics, columns, on_stage):
+            return {}
+
+        manager, (job,) = self.run_jobs(runner, 1, ttl_seconds=60)
+
+        self.assertIsNotNone(manager.get(job.id))
+        with patch("services.job_service.time.time", return_value=job.finished + 61):
+            self.assertIsNone(manager.get(job.id))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+import numpy as np
+from sklearn.datasets import make_blobs
+from services.k_selection_service import (
+    select_k,
+    exhaustive_k_sweep,
+    stratified_sample,
+    candidate_ks,
+)
+
+
+class TestKSelectionService(unittest.TestCase):
+    def setUp(self):
+        self.points, _ = make_blobs(
+            n_samples=600, centers=6, cluster_std=0.6, center_box=(-20, 20), random_state=3
+        )
+
+    def test_stratified_sample_keeps_every_cluster(self):
+        labels = np.array([0] * 950 + [1] * 45 + [2] * 5)
+        sample = stratified_sample(labels, 100)
+
+        self.assertLessEqual(len(sample), 110)
+        self.assertEqual(set(labels[sample]), {0, 1, 2})
+        self.assertEqual(len(set(sample)), len(sample))
+
+    def test_small_inputs_are_not_sampled(self):
+        labels = np.zeros(50, dtype=int)
+        self.assertEqual(stratified_sample(labels, 100).tolist(), list(range(50)))
+
+    def test_warm_started_selection_matches_exhaustive_sweep(self):
+        expected = exhaustive_k_sweep(self.points)
+        result = select_k(self.points, sample_size=200)
+
+        self.assertEqual(result.best_k, expected.best_k)
+        self.assertEqual(list(result.scores), list(candidate_ks(len(self.points))))
+
+    def test_parallel_selection_matches_exhaustive_sweep(self):
+        expected = exhaustive_k_sweep(self.points)
+        result = select_k(self.points, sample_size=200, n_jobs=2)
+
+        self.assertEqual(result.best_k, expected.best_k)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+from services import llm_cache_service
+from services.llm_cache_service import LLMCache, cached_llm_call, llm_cache_disabled, make_cache_key
+
+
+class TestLLMCacheService(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.cache = LLMCache(str(Path(self.tmp.name) / "responses.sqlite"), ttl_seconds=60, max_entries=3)
+        patcher = patch.object(llm_cache_service, "_cache", self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.calls = 0
+
+    def call(self) -> str:
+        self.calls += 1
+        return f"response {self.calls}"
+
+    def test_identical_calls_hit_the_cache(self):
+        first = cached_llm_call("gemini", "flash", ["prompt"], {"type": "string"}, self.call)
+        second = cached_llm_call("gemini", "flash", ["prompt"], {"type": "string"}, self.call)
+        other_schema = cached_llm_call("gemini", "flash", ["prompt"], {"type": "object"}, self.call)
+
+        self.assertEqual((first, second, other_schema), ("response 1", "response 1", "response 2"))
+        self.assertEqual(self.cache.stats(), {"hits": 1, "misses": 2, "entries": 2})
+
+    def test_key_covers_provider_model_prompt_and_schema(self):
+        base = make_cache_key("gemini", "flash", ["a", "b"], {"type": "string"})
+        self.assertNotEqual(base, make_cache_key("cerebras", "flash", ["a", "b"], {"type": "string"}))
+        self.assertNotEqual(base, make_cache_key("gemini", "pro", ["a", "b"], {"type": "string"}))
+        self.assertNotEqual(base, make_cache_key("gemini", "flash", ["ab"], {"type": "string"}))
+        self.assertNotEqual(base, make_cache_key("gemini", "flash", ["a", "b"], {"type": "array"}))
+
+    def test_opt_out_skips_the_cache(self):
+        cached_llm_call("gemini", "flash", ["prompt"], None, self.call)
+        with llm_cache_disabled():
+            fresh = cached_llm_call("gemini", "flash", ["prompt"], None, self.call)
+
+        self.assertEqual(fresh, "response 2")
+        self.assertEqual(self.cache.stats()["hits"], 0)
+
+    def test_entries_expire_after_ttl(self):
+        with patch("services.llm_cache_service.time.time", return_value=1000.0):
+            self.cache.put("key", "value")
+        with patch("services.llm_cache_service.time.time", return_value=1059.0):
+            self.assertEqual(self.cache.get("key"), "value")
+        with patch("services.llm_cache_service.time.time", return_value=1061.0):
+            self.assertIsNone(self.cache.get("key"))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        for i, key in enumerate(["a", "b", "c"]):
+            with patch("services.llm_cache_service.time.time", return_value=1000.0 + i):
+                self.cache.put(key, key)
+        with patch("services.llm_cache_service.time.time", return_value=1010.0):
+            self.cache.get("a")
+            self.cache.put("d", "d")
+
+        self.assertEqual(self.cache.stats()["entries"], 3)
+        with patch("services.llm_cache_service.time.time", return_value=1011.0):
+            self.assertIsNone(self.cache.get("b"))
+            self.assertEqual(self.cache.get("a"), "a")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+from unittest.mock import patch
+from google.genai.errors import ClientError
+from services import llm_rate_limit_service
+from services.llm_rate_limit_service import (
+    LLMRateLimitError,
+    RateLimiter,
+    TokenBucket,
+    call_with_retry,
+    is_transient,
+)
+
+
+class FlakyCall:
+    def __init__(self, errors: list[Exception]):
+        self.errors = errors
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+def rate_limited() -> ClientError:
+    return ClientError(429, {"error": {"code": 429, "message": "quota", "status": "RESOURCE_EXHAUSTED"}})
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_reservations_beyond_capacity_wait_for_refill(self):
+        with patch("services.llm_rate_limit_service.time.monotonic", return_value=0.0):
+            bucket = TokenBucket(per_minute=60)
+            waits = [bucket.reserve(30), bucket.reserve(30), bucket.reserve(30)]
+        self.assertEqual(waits, [0.0, 0.0, 30.0])
+        with patch("services.llm_rate_limit_service.time.monotonic", return_value=45.0):
+            self.assertEqual(bucket.reserve(10), 0.0)
+
+    def test_provider_and_model_quotas_are_shared(self):
+        limiter = RateLimiter({"gemini": (2, 0)}, {"flash": (0, 100)})
+        with patch("services.llm_rate_limit_service.time.monotonic", return_value=0.0):
+            self.assertEqual(limiter.reserve("gemini", "flash", 50), 0.0)
+            self.assertEqual(limiter.reserve("gemini", "pro", 500), 0.0)
+            self.assertAlmostEqual(limiter.reserve("gemini", "flash", 60), 30.0)
+            self.assertEqual(limiter.reserve("cerebras", "flash", 10), 0.0)
+
+
+class TestCallWithRetry(unittest.TestCase):
+    def setUp(self):
+        patchers = [
+            patch.object(llm_rate_limit_service, "_rate_limiter", RateLimiter({}, {})),
+            patch("services.llm_rate_limit_service.time.sleep"),
+        ]
+        self.sleep = patchers[1].start()
+        patchers[0].start()
+        for patcher in patchers:
+            self.addCleanup(patcher.stop)
+
+    def test_transient_errors_are_retried_with_growing_backoff(self):
+        call = FlakyCall([rate_limited(), ConnectionError("reset")])
+        with patch("services.llm_rate_limit_service.random.uniform", side_effect=lambda low, high: high):
+            self.assertEqual(call_with_retry("gemini", "flash", ["prompt"], call), "ok")
+
+        self.assertEqual(call.calls, 3)
+        self.assertEqual([c.args[0] for c in self.sleep.call_args_list], [0.5, 1.0])
+
+    def test_permanent_errors_are_not_retried(self):
+        call = FlakyCall([ValueError("bad schema")])
+        with self.assertRaises(ValueError):
+            call_with_retry("gemini", "flash", ["prompt"], call)
+        self.assertEqual(call.calls, 1)
+
+    def test_exhausted_rate_limit_raises_retryable_error(self):
+        call = FlakyCall([rate_limited() for _ in range(10)])
+        with self.assertRaises(LLMRateLimitError) as raised:
+            call_with_retry("gemini", "flash", ["prompt"], call)
+        self.assertEqual(call.calls, llm_rate_limit_service.LLM_RETRY_ATTEMPTS)
+        self.assertEqual(raised.exception.provider, "gemini")
+
+    def test_status_codes_decide_transience(self):
+        self.assertTrue(is_transient(rate_limited()))
+        self.assertFalse(is_transient(ClientError(400, {"error": {"code": 400, "message": "bad"}})))
+
+
+if __name__ == "__main__":
+    unittest.main()
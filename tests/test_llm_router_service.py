@@ -0,0 +1,125 @@
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+from services.llm_router_service import CircuitBreaker, ProviderRouter, MIN_SAMPLES
+from services.cancellation_service import AnalysisCancelled
+from services import llm_cache_service
+from services.llm_cache_service import LLMCache, cached_llm_call
+
+
+def failing_call():
+    raise RuntimeError("provider down")
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_opens_on_error_rate_and_closes_after_successful_probe(self):
+        breaker = CircuitBreaker(window=20, error_rate=0.5, slow_seconds=10, cooldown_seconds=30)
+        with patch("services.llm_router_service.time.monotonic", return_value=100.0):
+            for _ in range(MIN_SAMPLES):
+                breaker.record(False, 0.1)
+            self.assertEqual(breaker.state, "open")
+            self.assertFalse(breaker.allow())
+        with patch("services.llm_router_service.time.monotonic", return_value=131.0):
+            self.assertTrue(breaker.allow())
+            self.assertFalse(breaker.allow())
+            breaker.record(True, 0.2)
+        self.assertEqual(breaker.state, "closed")
+
+    def test_opens_when_p95_latency_is_too_slow(self):
+        breaker = CircuitBreaker(window=20, error_rate=0.5, slow_seconds=1, cooldown_seconds=30)
+        for _ in range(MIN_SAMPLES):
+            breaker.record(True, 2.0)
+        self.assertEqual(breaker.state, "open")
+
+
+class TestProviderRouter(unittest.TestCase):
+    def test_falls_back_when_primary_fails(self):
+        router = ProviderRouter(hedge_enabled=False, max_workers=4)
+        result = router.call([("gemini", failing_call), ("cerebras", lambda: "cerebras")])
+        self.assertEqual(result, "cerebras")
+
+    def test_raises_last_error_when_all_providers_fail(self):
+        router = ProviderRouter(hedge_enabled=False, max_workers=4)
+        with self.assertRaises(RuntimeError):
+            router.call([("gemini", failing_call), ("cerebras", failing_call)])
+
+    def test_hedges_slow_primary_and_takes_first_answer(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        def slow_call():
+            release.wait(5)
+            return "gemini"
+
+        router = ProviderRouter(hedge_enabled=True, default_delay=0.05, min_delay=0.0, max_workers=4)
+        start = time.monotonic()
+        result = router.call([("gemini", slow_call), ("cerebras", lambda: "cerebras")])
+
+        self.assertEqual(result, "cerebras")
+        self.assertLess(time.monotonic() - start, 2)
+
+    def test_skips_provider_with_open_breaker(self):
+        router = ProviderRouter(hedge_enabled=False, max_workers=4)
+        for _ in range(MIN_SAMPLES):
+            router.breakers["gemini"].record(False, 0.1)
+        calls = []
+
+        def gemini_call():
+            calls.append("gemini")
+            return "gemini"
+
+        result = router.call([("gemini", gemini_call), ("cerebras", lambda: "cerebras")])
+        self.assertEqual(result, "cerebras")
+        self.assertEqual(calls, [])
+
+    def test_cancelled_calls_do_not_trip_the_breaker(self):
+        router = ProviderRouter(hedge_enabled=False, max_workers=4)
+
+        def cancelled_call():
+            raise AnalysisCancelled()
+
+        for _ in range(MIN_SAMPLES + 2):
+            with self.assertRaises(AnalysisCancelled):
+                router.submit("gemini", cancelled_call).result()
+
+        self.assertEqual(router.breakers["gemini"].state, "closed")
+        self.assertEqual(len(router.breakers["gemini"].outcomes), 0)
+
+    def test_cancelled_probe_frees_the_half_open_slot(self):
+        breaker = CircuitBreaker(window=20, error_rate=0.5, slow_seconds=10, cooldown_seconds=30)
+        with patch("services.llm_router_service.time.monotonic", return_value=100.0):
+            for _ in range(MIN_SAMPLES):
+                breaker.record(False, 0.1)
+        with patch("services.llm_router_service.time.monotonic", return_value=131.0):
+            self.assertTrue(breaker.allow())
+            breaker.abandon()
+            self.assertTrue(breaker.allow())
+
+    def test_cache_hits_are_not_recorded_as_provider_latency(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        cache = LLMCache(str(Path(tmp.name) / "responses.sqlite"), ttl_seconds=60, max_entries=10)
+        router = ProviderRouter(hedge_enabled=False, max_workers=2)
+
+        def gemini_call():
+            return cached_llm_call("gemini", "flash", ["prompt"], None, lambda: "answer")
+
+        with patch.object(llm_cache_service, "_cache", cache):
+            for _ in range(3):
+                self.assertEqual(router.call([("gemini", gemini_call)]), "answer")
+
+        self.assertEqual(len(router.breakers["gemini"].outcomes), 1)
+
+    def test_hedge_delay_follows_observed_latency_percentile(self):
+        router = ProviderRouter(hedge_percentile=95, default_delay=8, min_delay=0.5, max_workers=1)
+        self.assertEqual(router.hedge_delay("gemini"), 8)
+        for latency in range(1, 21):
+            router.breakers["gemini"].record(True, latency / 10)
+        self.assertAlmostEqual(router.hedge_delay("gemini"), 1.905)
+
+
+if __name__ == "__main__":
+    unittest.main()
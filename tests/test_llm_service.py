@@ -0,0 +1,220 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+os.environ.setdefault("GEMINI_API_KEY", "test")
+os.environ.setdefault("CEREBRAS_API_KEY", "test")
+
+from models.models import ClusterDescription, SentimentResponse, TopicBatchItem
+from services import llm_cache_service, llm_service
+from services.analysis_context import AnalysisContext
+from services.file_handler_service import create_dataset_from_sentiment_response_list
+
+
+class ConcurrencyProbe:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+
+    def __enter__(self):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+
+    def __exit__(self, *exc):
+        with self.lock:
+            self.active -= 1
+
+
+class TopicsFixture(unittest.TestCase):
+    def setUp(self):
+        self.topics = [f"Topic {i}" for i in range(6)]
+        self.feedback = [
+            SentimentResponse(text=f"text {i} {j}", topic=topic, sentiment="Neutral")
+            for i, topic in enumerate(self.topics)
+            for j in range(i + 1)
+        ]
+        self.context = AnalysisContext()
+        create_dataset_from_sentiment_response_list(self.context, self.feedback)
+        self.probe = ConcurrencyProbe()
+
+    def fake_summary(self, texts, topic):
+        with self.probe:
+            time.sleep(0.05 * (6 - int(topic.split()[-1])))
+        if topic == "Topic 3":
+            raise RuntimeError("provider down")
+        return f"{topic}: {len(texts)} texts"
+
+    def fake_description(self, names):
+        with self.probe:
+            time.sleep(0.05)
+        return [ClusterDescription(cluster_name=name, description=f"about {name}") for name in names]
+
+
+class TestTopicsAnalysis(TopicsFixture):
+    def run_analysis(self, concurrency: int):
+        with patch.object(llm_service, "get_topic_summary", self.fake_summary), \
+             patch.object(llm_service, "get_topic_description", self.fake_description), \
+             patch.object(llm_service, "LLM_CONCURRENCY", concurrency):
+            return llm_service.topics_analysis(self.context, self.feedback)
+
+    def test_results_keep_topic_order_and_isolate_failures(self):
+        results = self.run_analysis(concurrency=4)
+
+        self.assertEqual([item["topic"] for item in results], self.topics)
+        self.assertEqual([item["count"] for item in results], [1, 2, 3, 4, 5, 6])
+        self.assertIn("Topic 0: 1 texts", results[0]["summary"])
+        self.assertIn("about Topic 5", results[5]["summary"])
+        self.assertIn("Topic summary unavailable.", results[3]["summary"])
+        self.assertIn("Topic 4: 5 texts", results[4]["summary"])
+        self.assertEqual(self.context.fallbacks, ["topic 'Topic 3'"])
+
+    def test_concurrency_is_bounded(self):
+        self.run_analysis(concurrency=3)
+        self.assertEqual(self.probe.peak, 3)
+
+    def test_description_failure_keeps_summaries(self):
+        with patch.object(llm_service, "get_topic_summary", self.fake_summary), \
+             patch.object(llm_service, "get_topic_description", side_effect=RuntimeError("boom")):
+            results = llm_service.topics_analysis(self.context, self.feedback)
+
+        self.assertIn("Topic description: unavailable.", results[0]["summary"])
+        self.assertIn("Topic 0: 1 texts", results[0]["summary"])
+        self.assertIn("topic descriptions", self.context.fallbacks)
+
+
+class TestBatchedTopicsAnalysis(TopicsFixture):
+    def fake_batch(self, topic_samples):
+        return {
+            topic: TopicBatchItem(topic=topic, description=f"batched {topic}", summary=f"{len(texts)} texts")
+            for topic, texts in topic_samples.items()
+        }
+
+    def run_batched(self, batch, budget=24000):
+        with patch.object(llm_service, "get_topics_batch", batch) as get_topics_batch, \
+             patch.object(llm_service, "get_topic_summary", self.fake_summary), \
+             patch.object(llm_service, "get_topic_description", self.fake_description), \
+             patch.object(llm_service, "TOPICS_ANALYSIS_MODE", "batched"), \
+             patch.object(llm_service, "TOPIC_BATCH_TOKEN_BUDGET", budget):
+            return llm_service.topics_analysis(self.context, self.feedback)
+
+    def test_all_topics_come_from_one_batched_call(self):
+        batch = MagicMock(side_effect=self.fake_batch)
+        results = self.run_batched(batch)
+
+        self.assertEqual(batch.call_count, 1)
+        self.assertEqual([item["count"] for item in results], [1, 2, 3, 4, 5, 6])
+        self.assertIn("Topic description: batched Topic 2", results[2]["summary"])
+        self.assertIn("Topic summary: 3 texts", results[2]["summary"])
+        self.assertIn("Representative quotes:", results[2]["summary"])
+
+    def test_batches_are_chunked_by_token_budget(self):
+        batch = MagicMock(side_effect=self.fake_batch)
+        results = self.run_batched(batch, budget=15)
+
+        self.assertGreater(batch.call_count, 1)
+        self.assertEqual(sorted(topic for call in batch.call_args_list for topic in call.args[0]), self.topics)
+        self.assertTrue(all("batched" in item["summary"] for item in results))
+
+    def test_failed_batch_falls_back_to_per_topic_calls(self):
+        results = self.run_batched(MagicMock(side_effect=ValueError("schema mismatch")))
+
+        self.assertIn("about Topic 1", results[1]["summary"])
+        self.assertIn("Topic 1: 2 texts", results[1]["summary"])
+        self.assertIn("Topic summary unavailable.", results[3]["summary"])
+
+
+class TestTopicsBatchValidation(unittest.TestCase):
+    def test_missing_topics_fail_validation_on_both_providers(self):
+        partial = [TopicBatchItem(topic="A", description="d", summary="s")]
+        with patch.object(llm_service, "generate_topics_batch", return_value=partial), \
+             patch.object(llm_service, "generate_topics_batch_cerebras", return_value=partial):
+            with self.assertRaises(ValueError):
+                llm_service.get_topics_batch({"A": ["x"], "B": ["y"]})
+
+
+class TestSummarizeTopic(unittest.TestCase):
+    def test_quotes_are_picked_locally_and_prompt_gets_only_the_sample(self):
+        texts = [f"feedback {i}" for i in range(6)]
+        embeddings = [[1.0, 0.0], [0.0, 1.0], [0.8, 0.2], [0.7, 0.3], [0.1, 0.9], [0.6, 0.4]]
+        prompts = []
+
+        def fake_summary(sample, topic):
+            prompts.append(sample)
+            return "Short prose."
+
+        with patch.object(llm_service, "get_topic_summary", fake_summary):
+            summary = llm_service.summarize_topic(texts, embeddings, "Pricing")
+
+        self.assertTrue(summary.startswith("Topic summary: Short prose."))
+        quotes = summary.split("Representative quotes: ")[1].split("\n  ● ")[1:]
+        self.assertEqual(len(quotes), 3)
+        self.assertTrue(set(quotes) <= set(texts))
+        self.assertEqual(len(prompts), 1)
+
+
+class TestCachedProviderCalls(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.cache = llm_cache_service.LLMCache(str(Path(tmp.name) / "responses.sqlite"), 3600, 100)
+        patcher = patch.object(llm_cache_service, "_cache", self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_repeated_gemini_prompt_is_served_from_cache(self):
+        client = MagicMock()
+        client.models.generate_content.return_value = SimpleNamespace(text='{"name": "Pricing", "description": "Cost"}')
+
+        with patch.object(llm_service, "client", client):
+            first = llm_service.generate_cluster_name("price cost plan")
+            second = llm_service.generate_cluster_name("price cost plan")
+            llm_service.generate_cluster_name("support team")
+
+        self.assertEqual((first, second), ("Pricing", "Pricing"))
+        self.assertEqual(client.models.generate_content.call_count, 2)
+        self.assertEqual(self.cache.stats()["hits"], 1)
+
+    def test_invalid_gemini_response_is_not_cached(self):
+        client = MagicMock()
+        client.models.generate_content.return_value = SimpleNamespace(text='{"label": "Pricing"}')
+
+        with patch.object(llm_service, "client", client):
+            with self.assertRaises(Exception):
+                llm_service.generate_cluster_name("price cost plan")
+
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+    def test_cerebras_completion_is_cached_per_prompt(self):
+        client = MagicMock()
+        client.chat.completions.create.return_value = SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content='{"separator": ";"}'))]
+        )
+
+        with patch.object(llm_service, "client_cerebras", client):
+            separators = [llm_service.generate_separator_cerebras("a;b;c") for _ in range(3)]
+
+        self.assertEqual(separators, [";", ";", ";"])
+        self.assertEqual(client.chat.completions.create.call_count, 1)
+
+    def test_invalid_cerebras_response_is_not_cached(self):
+        for content in ['{"separator": ";"', '{"sep": ";"}', '{"separator": 3}']:
+            client = MagicMock()
+            client.chat.completions.create.return_value = SimpleNamespace(
+                choices=[SimpleNamespace(message=SimpleNamespace(content=content))]
+            )
+            with self.subTest(content=content), patch.object(llm_service, "client_cerebras", client):
+                with self.assertRaises(ValueError):
+                    llm_service.generate_separator_cerebras("a;b;c")
+
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import asyncio
+import io
+import json
+import os
+import unittest
+from unittest.mock import patch
+from fastapi import UploadFile
+from fastapi.testclient import TestClient
+
+os.environ.setdefault("GEMINI_API_KEY", "test")
+os.environ.setdefault("CEREBRAS_API_KEY", "test")
+
+import main
+from services.admission_service import AdmissionController
+
+
+class TestAdmittedStreamingResponse(unittest.TestCase):
+    def test_slot_is_released_when_headers_cannot_be_sent(self):
+        started = []
+
+        async def body():
+            started.append(True)
+            yield "line\n"
+
+        async def receive():
+            await asyncio.Event().wait()
+
+        async def failing_send(message):
+            raise OSError("client went away")
+
+        async def scenario():
+            controller = AdmissionController(max_concurrent=1, max_queued=0)
+            with patch.object(main, "admission", controller):
+                await controller.acquire(10)
+                response = main.AdmittedStreamingResponse(body(), 10, media_type="application/x-ndjson")
+                scope = {"type": "http", "asgi": {"spec_version": "2.4"}}
+                with self.assertRaises(Exception):
+                    await response(scope, receive, failing_send)
+            return controller
+
+        controller = asyncio.run(scenario())
+        self.assertEqual(started, [])
+        self.assertEqual((controller.active, controller.memory_in_use), (0, 0))
+
+
+class TestCachedResultsSkipAdmission(unittest.TestCase):
+    def setUp(self):
+        self.result = {"filename": "feedback.csv", "all_feedbacks": [], "feedback_analysis": [], "phrase_clusters": [],
+                       "sentiment": {}, "topics": [], "summary": "cached"}
+        self.full = AdmissionController(max_concurrent=1, max_queued=0)
+        self.full.active = 1
+
+        async def lookup(file, topics, columns):
+            return "key", (dict(self.result) if file.filename == "cached.csv" else None)
+
+        for patcher in [patch.object(main, "admission", self.full), patch.object(main, "lookup_cached_analysis", lookup)]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.client = TestClient(main.app)
+
+    def post(self, path: str, filename: str):
+        return self.client.post(path, files={"file": (filename, b"Text\nfine", "text/csv")})
+
+    def test_cache_hits_are_served_while_all_slots_are_busy(self):
+        self.assertEqual(self.post("/api/feedback/analyze", "cached.csv").json(), self.result)
+
+        response = self.post("/api/feedback/analyze/stream", "cached.csv")
+        events = [json.loads(line)["event"] for line in response.text.splitlines()]
+        self.assertEqual(events, ["dataset", "clusters", "topics", "summary", "done"])
+
+        upload = UploadFile(file=io.BytesIO(b"Text\nfine"), filename="cached.csv")
+        self.assertEqual(asyncio.run(main.admitted_job_analysis(upload, "", "")), self.result)
+        self.assertEqual(self.full.active, 1)
+
+    def test_cache_misses_still_need_a_slot(self):
+        self.assertEqual(self.post("/api/feedback/analyze", "new.csv").status_code, 429)
+        self.assertEqual(self.post("/api/feedback/analyze/stream", "new.csv").status_code, 429)
+
+
+if __name__ == "__main__":
+    unittest.main()
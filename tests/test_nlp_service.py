@@ -0,0 +1,98 @@
+import os
+import threading
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+import torch
+
+os.environ.setdefault("GEMINI_API_KEY", "test")
+os.environ.setdefault("CEREBRAS_API_KEY", "test")
+
+from services import nlp_service
+from services.analysis_context import AnalysisContext
+from services.nlp_service import make_length_batches, predict_sentiment, name_clusters
+
+
+class FakeTokenizer:
+    def __call__(self, texts, truncation=True, max_length=512):
+        input_ids = [[len(word) for word in text.split()][:max_length] for text in texts]
+        return {"input_ids": input_ids, "attention_mask": [[1] * len(ids) for ids in input_ids]}
+
+    def pad(self, encodings, return_tensors="pt"):
+        longest = max(len(ids) for ids in encodings["input_ids"])
+        return {
+            key: torch.tensor([values + [0] * (longest - len(values)) for values in encodings[key]])
+            for key in encodings
+        }
+
+
+class FakeModel:
+    def __init__(self):
+        self.batch_shapes = []
+
+    def __call__(self, input_ids, attention_mask):
+        self.batch_shapes.append(tuple(input_ids.shape))
+        labels = attention_mask.sum(dim=-1) % 5
+        return SimpleNamespace(logits=torch.nn.functional.one_hot(labels, num_classes=5).float())
+
+
+class TestNlpService(unittest.TestCase):
+    def test_length_batches_respect_token_budget(self):
+        lengths = [5, 40, 3, 3, 12, 40, 7, 1]
+        batches = make_length_batches(lengths, token_budget=40)
+
+        self.assertEqual(sorted(i for batch in batches for i in batch), list(range(len(lengths))))
+        for batch in batches:
+            longest = max(lengths[i] for i in batch)
+            self.assertTrue(len(batch) == 1 or longest * len(batch) <= 40)
+
+    def test_predict_sentiment_restores_original_order(self):
+        texts = ["word " * n for n in [4, 1, 3, 2, 0, 4, 2, 1]]
+        model = FakeModel()
+        expected = ["Negative", "Negative", "Neutral", "Positive", "Positive"]
+
+        with patch("services.nlp_service.get_sentiment_model", return_value=(FakeTokenizer(), model)):
+            sentiments = predict_sentiment(texts, token_budget=6)
+
+        self.assertEqual(sentiments, [expected[len(text.split()) % 5] for text in texts])
+        self.assertGreater(len(model.batch_shapes), 1)
+        self.assertTrue(all(rows * cols <= 6 or rows == 1 for rows, cols in model.batch_shapes))
+
+
+class TestNameClusters(unittest.TestCase):
+    def test_names_are_requested_concurrently_with_keyword_fallback(self):
+        barrier = threading.Barrier(3, timeout=5)
+
+        def fake_cluster_name(keyword_prompt):
+            barrier.wait()
+            if keyword_prompt.startswith("refund"):
+                raise RuntimeError("provider down")
+            return f"Name for {keyword_prompt}"
+
+        cluster_keywords = {
+            -1: [("NOISE", 1.0)],
+            0: [("price", 1.2), ("expensive", 0.9), ("plan", 0.4), ("cost", 0.1)],
+            1: [("support", 2.0), ("team", 1.0)],
+            2: [("refund", 1.0), ("billing", 0.5)],
+            3: [],
+        }
+        context = AnalysisContext()
+        with patch.object(nlp_service, "get_cluster_name", fake_cluster_name), \
+             patch.object(nlp_service, "LLM_CONCURRENCY", 3):
+            names = name_clusters(cluster_keywords, context)
+
+        self.assertEqual(
+            names,
+            {
+                -1: "NOISE",
+                0: "Name for price expensive plan",
+                1: "Name for support team",
+                2: "Refund Billing",
+                3: "Cluster 3",
+            },
+        )
+        self.assertEqual(context.fallbacks, ["name of cluster 2"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import importlib.util
+import tempfile
+import unittest
+from pathlib import Path
+import torch
+from transformers import DistilBertConfig, DistilBertForSequenceClassification
+from services.onnx_sentiment_service import (
+    export_onnx_model,
+    load_onnx_sentiment_model,
+    OnnxParityError,
+    OnnxSentimentModel,
+)
+
+
+def tiny_classifier():
+    torch.manual_seed(0)
+    config = DistilBertConfig(
+        vocab_size=100, dim=32, hidden_dim=64, n_layers=2, n_heads=2, num_labels=5
+    )
+    return DistilBertForSequenceClassification(config).eval()
+
+
+def sample_inputs(batch: int, length: int) -> dict:
+    generator = torch.Generator().manual_seed(batch * 100 + length)
+    input_ids = torch.randint(1, 100, (batch, length), generator=generator)
+    attention_mask = torch.ones_like(input_ids)
+    attention_mask[0, length // 2:] = 0
+    return {"input_ids": input_ids, "attention_mask": attention_mask}
+
+
+@unittest.skipIf(importlib.util.find_spec("onnxruntime") is None, "onnxruntime is not installed")
+class TestOnnxSentimentService(unittest.TestCase):
+    def test_exported_model_matches_torch_logits(self):
+        model = tiny_classifier()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = export_onnx_model(
+                model, sample_inputs(2, 8), str(Path(tmp) / "model.onnx"), quantize=False
+            )
+            onnx_model = OnnxSentimentModel(path)
+
+            for batch, length in [(1, 5), (4, 17)]:
+                inputs = sample_inputs(batch, length)
+                with torch.no_grad():
+                    expected = model(**inputs).logits
+                actual = onnx_model(**inputs).logits
+                self.assertTrue(torch.allclose(actual, expected, atol=1e-4))
+
+    def test_quantized_export_runs_with_dynamic_shapes(self):
+        model = tiny_classifier()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = export_onnx_model(model, sample_inputs(2, 8), str(Path(tmp) / "model.onnx"))
+            onnx_model = OnnxSentimentModel(path)
+
+            logits = onnx_model(**sample_inputs(3, 11)).logits
+            self.assertEqual(tuple(logits.shape), (3, 5))
+            self.assertEqual(sorted(p.name for p in Path(tmp).iterdir()), ["model.onnx"])
+
+    def test_export_is_rejected_when_labels_drift_from_torch(self):
+        model = tiny_classifier()
+
+        def tokenizer(texts, **kwargs):
+            return sample_inputs(len(texts), 12)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = str(Path(tmp) / "model.onnx")
+            onnx_model = load_onnx_sentiment_model(model, tokenizer, path, quantize=False, min_agreement=1.0)
+            self.assertIsInstance(onnx_model, OnnxSentimentModel)
+
+            Path(path).unlink()
+            with self.assertRaises(OnnxParityError):
+                load_onnx_sentiment_model(model, tokenizer, path, quantize=False, min_agreement=1.01)
+            self.assertFalse(Path(path).exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
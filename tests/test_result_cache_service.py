@@ -0,0 +1,49 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+import numpy as np
+from services.result_cache_service import ResultCache, make_result_key
+
+
+class TestResultCacheService(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = str(Path(tmp.name) / "results.sqlite")
+
+    def test_key_depends_on_content_options_and_config(self):
+        base = make_result_key(b"Text\na", "a.csv", "", "", {"version": 1})
+        self.assertEqual(base, make_result_key(b"Text\na", "b.CSV", "", "", {"version": 1}))
+        self.assertNotEqual(base, make_result_key(b"Text\nb", "a.csv", "", "", {"version": 1}))
+        self.assertNotEqual(base, make_result_key(b"Text\na", "a.txt", "", "", {"version": 1}))
+        self.assertNotEqual(base, make_result_key(b"Text\na", "a.csv", "pricing", "", {"version": 1}))
+        self.assertNotEqual(base, make_result_key(b"Text\na", "a.csv", "", "Text", {"version": 1}))
+        self.assertNotEqual(base, make_result_key(b"Text\na", "a.csv", "", "", {"version": 2}))
+
+    def test_least_recently_used_results_are_evicted_by_size(self):
+        rng = np.random.default_rng(0)
+        payloads = {key: {"blob": rng.bytes(300).hex()} for key in "abc"}
+        cache = ResultCache(self.path, max_bytes=800)
+
+        for i, key in enumerate("ab"):
+            with patch("services.result_cache_service.time.time", return_value=100.0 + i):
+                cache.put(key, payloads[key])
+        with patch("services.result_cache_service.time.time", return_value=200.0):
+            cache.get("a")
+        with patch("services.result_cache_service.time.time", return_value=201.0):
+            cache.put("c", payloads["c"])
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), payloads["a"])
+        self.assertLessEqual(cache.stats()["bytes_stored"], 800)
+
+    def test_numpy_values_are_stored_as_json(self):
+        cache = ResultCache(self.path, max_bytes=1 << 20)
+        cache.put("key", {"rating": np.int64(4), "x": np.float32(0.5)})
+        self.assertEqual(cache.get("key"), {"rating": 4, "x": 0.5})
+        self.assertEqual(cache.stats()["hit_rate"], 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
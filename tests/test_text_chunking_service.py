@@ -0,0 +1,141 @@
+import random
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+import spacy
+from spacy.tokens import Doc
+from services import text_chunking_service
+from services.text_chunking_service import clean_chunk, is_valid_chunk
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+def load_nlp():
+    try:
+        return spacy.load("en_core_web_sm")
+    except OSError:
+        return spacy.blank("en")
+
+
+def load_corpus() -> list[str]:
+    return (FIXTURES_DIR / "feedback_corpus.txt").read_text(encoding="utf-8").splitlines()
+
+
+def quadratic_split_doc(doc):
+    # Reference copy of the original splitter that rescans the spans around every token.
+    text = doc.text
+    split_indices = [0]
+    hard_splitters = {
+        "however", "nevertheless", "nonetheless", "conversely",
+        "otherwise", "instead", "therefore", "thus", "hence",
+        "accordingly", "consequently", "meanwhile", "furthermore",
+        "moreover", "besides", "whereas", "although", "though", "yet"
+    }
+    for token in doc:
+        if token.text.lower() in hard_splitters:
+            split_indices.append(token.idx)
+            continue
+        if token.text.lower() == "but":
+            split_indices.append(token.idx)
+            continue
+        if token.text.lower() == "and":
+            right_span = doc[token.i+1:]
+            has_subj = any(t.dep_ in ("nsubj", "nsubjpass", "expl") for t in right_span)
+            has_verb = any(t.pos_ in ("VERB", "AUX") for t in right_span)
+            prev_token = doc[token.i - 1] if token.i > 0 else None
+            if prev_token and prev_token.pos_ in ("NOUN", "PROPN", "ADJ") and \
+               len(right_span) > 0 and right_span[0].pos_ in ("NOUN", "PROPN", "ADJ") and not has_verb:
+                continue
+            if has_subj and has_verb:
+                split_indices.append(token.idx)
+            continue
+        if token.text in [",", ";"]:
+            right_span = doc[token.i+1:]
+            left_span = doc[split_indices[-1]:token.i] if split_indices else doc[:token.i]
+            has_verb_right = any(t.pos_ in ("VERB", "AUX") for t in right_span)
+            has_verb_left = any(t.pos_ in ("VERB", "AUX") for t in left_span)
+            has_subj_right = any(t.dep_ in ("nsubj", "nsubjpass", "expl") for t in right_span)
+            if has_subj_right and has_verb_right:
+                split_indices.append(token.idx + 1)
+            elif not has_verb_left and not has_verb_right:
+                if len(doc[token.i+1:].text) > 10:
+                    split_indices.append(token.idx + 1)
+        if token.dep_ in ("nsubj", "nsubjpass", "expl"):
+            if token.i > 0:
+                prev = doc[token.i - 1]
+                if prev.pos_ in ("VERB", "AUX", "NOUN", "ADJ", "ADV") and \
+                   prev.dep_ not in ("amod", "det", "compound", "poss") and \
+                   prev.head != token and token.head != prev:
+                    split_indices.append(token.left_edge.idx)
+    split_indices.append(len(text))
+    split_indices = sorted(list(set(split_indices)))
+    final_splits = []
+    for i in range(len(split_indices) - 1):
+        chunk = text[split_indices[i]:split_indices[i+1]]
+        cleaned = clean_chunk(chunk)
+        if is_valid_chunk(cleaned):
+            final_splits.append(cleaned)
+    return final_splits
+
+
+def random_doc(vocab, rng: random.Random) -> Doc:
+    words_pool = [
+        "and", "but", ",", ";", "however", "the", "app", "support", "is", "was",
+        "slow", "pricing", "team", "we", "it", "there", "love", "crashes", "very",
+    ]
+    pos_pool = ["NOUN", "PROPN", "ADJ", "VERB", "AUX", "ADV", "DET", "PRON", "CCONJ", "PUNCT"]
+    dep_pool = ["nsubj", "nsubjpass", "expl", "amod", "det", "compound", "poss", "dobj", "advmod", "cc"]
+    length = rng.randint(1, 60)
+    words = [rng.choice(words_pool) for _ in range(length)]
+    spaces = [rng.random() < 0.8 for _ in range(length)]
+    heads = [0] + [rng.randrange(0, i) for i in range(1, length)]
+    deps = ["ROOT"] + [rng.choice(dep_pool) for _ in range(1, length)]
+    pos = [rng.choice(pos_pool) for _ in range(length)]
+    return Doc(vocab, words=words, spaces=spaces, heads=heads, deps=deps, pos=pos)
+
+
+class TestTextChunkingService(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.nlp = load_nlp()
+        cls.corpus = load_corpus()
+
+    def test_batched_chunking_matches_per_segment_chunking(self):
+        with patch("services.text_chunking_service.get_spacy_nlp", return_value=self.nlp):
+            expected_chunks = []
+            expected_numbers = []
+            for feedback in self.corpus:
+                chunks = text_chunking_service.test_chunks(feedback)
+                expected_chunks.extend(chunks)
+                expected_numbers.append(len(chunks))
+
+            for batch_size in (1, 7, 256):
+                chunks, number_list = text_chunking_service.feedback_chunking(self.corpus, batch_size=batch_size)
+                self.assertEqual(chunks, expected_chunks)
+                self.assertEqual(number_list, expected_numbers)
+
+    def test_empty_feedback_gets_zero_chunks(self):
+        with patch("services.text_chunking_service.get_spacy_nlp", return_value=self.nlp):
+            chunks, number_list = text_chunking_service.feedback_chunking(["", "Crashes every time I open settings."])
+        self.assertEqual(number_list[0], 0)
+        self.assertEqual(len(chunks), number_list[1])
+
+
+class TestLinearSentenceSplit(unittest.TestCase):
+    def test_matches_quadratic_split_on_fixture_corpus(self):
+        nlp = load_nlp()
+        for feedback in load_corpus():
+            for seg in text_chunking_service.split_segments(feedback):
+                doc = nlp(seg)
+                self.assertEqual(text_chunking_service.split_doc(doc), quadratic_split_doc(doc), seg)
+
+    def test_matches_quadratic_split_on_random_parses(self):
+        vocab = spacy.blank("en").vocab
+        rng = random.Random(67)
+        for _ in range(500):
+            doc = random_doc(vocab, rng)
+            self.assertEqual(text_chunking_service.split_doc(doc), quadratic_split_doc(doc), doc.text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import json
+import os
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+import numpy as np
+
+os.environ.setdefault("GEMINI_API_KEY", "test")
+os.environ.setdefault("CEREBRAS_API_KEY", "test")
+
+from services import topic_filter_service
+from services.topic_filter_service import filter_cluster_topics, select_matching_topics, split_requested_topics
+from services.cancellation_service import AnalysisCancelled
+
+CONCEPTS = {
+    "price": [1, 0, 0, 0],
+    "expensive": [1, 0, 0, 0],
+    "billing": [0.75, 0.66, 0, 0],
+    "support": [0, 0, 1, 0],
+    "speed": [0, 0, 0, 1],
+    "slow": [0, 0, 0, 1],
+}
+
+
+class FakeEncoder:
+    def encode(self, texts, device="cpu"):
+        vectors = []
+        for text in texts:
+            vector = np.array([0, 0, 0, 0, 0.01])
+            for word, concept in CONCEPTS.items():
+                if word in text.lower():
+                    vector[:4] += concept
+            vectors.append(vector)
+        return np.array(vectors)
+
+
+class TestTopicFilterService(unittest.TestCase):
+    def setUp(self):
+        self.names = ["Price and Value", "Billing Problems", "Support Team", "App Speed"]
+        patches = [
+            patch.object(topic_filter_service, "get_embedding_model", return_value=FakeEncoder()),
+            patch.object(topic_filter_service, "encode_with_cache", lambda model, name, texts, device: model.encode(texts)),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_splits_requested_topics(self):
+        self.assertEqual(split_requested_topics(" pricing, support ;\nspeed,, "), ["pricing", "support", "speed"])
+
+    def test_selects_clusters_above_threshold_in_cluster_order(self):
+        selected = select_matching_topics("slow, expensive", self.names, threshold=0.5, margin=0.05)
+        self.assertEqual(selected, ["Price and Value", "Billing Problems", "App Speed"])
+
+    def test_all_intent_and_no_match(self):
+        self.assertEqual(select_matching_topics("everything", self.names), self.names)
+        self.assertEqual(select_matching_topics("weather", self.names, threshold=0.5), [])
+        self.assertEqual(select_matching_topics("", self.names), [])
+
+    def test_llm_only_breaks_ties_near_the_threshold(self):
+        with patch.object(topic_filter_service, "get_filtered_topics", return_value=[]) as tiebreak:
+            selected = select_matching_topics("expensive", self.names, threshold=0.72, margin=0.05, llm_tiebreak=True)
+
+        tiebreak.assert_called_once_with("expensive", "Billing Problems")
+        self.assertEqual(selected, ["Price and Value"])
+
+    def test_tiebreak_failure_falls_back_to_threshold(self):
+        with patch.object(topic_filter_service, "get_filtered_topics", side_effect=RuntimeError("down")):
+            selected = select_matching_topics("expensive", self.names, threshold=0.72, margin=0.05, llm_tiebreak=True)
+
+        self.assertEqual(selected, ["Price and Value", "Billing Problems"])
+
+    def test_tiebreak_does_not_swallow_cancellation(self):
+        with patch.object(topic_filter_service, "get_filtered_topics", side_effect=AnalysisCancelled()):
+            with self.assertRaises(AnalysisCancelled):
+                select_matching_topics("expensive", self.names, threshold=0.72, margin=0.05, llm_tiebreak=True)
+
+    def test_llm_mode_is_the_default(self):
+        with patch.object(topic_filter_service, "get_filtered_topics", return_value=["Support Team"]) as llm:
+            self.assertEqual(filter_cluster_topics("help", self.names), ["Support Team"])
+        llm.assert_called_once_with(selected_topics="help", all_topics_list=", ".join(self.names))
+
+        with patch.object(topic_filter_service, "TOPIC_FILTER_MODE", "embedding"):
+            self.assertEqual(filter_cluster_topics("slow", self.names), ["App Speed"])
+
+    def test_eval_fixture_labels_are_cluster_names(self):
+        fixture = Path(__file__).parent / "fixtures" / "topic_filter_eval.json"
+        for case in json.loads(fixture.read_text()):
+            with self.subTest(query=case["query"]):
+                self.assertLessEqual(set(case["expected"]), set(case["cluster_names"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+import numpy as np
+from services.topic_sampling_service import (
+    estimate_prompt_tokens,
+    pack_topic_samples,
+    select_representative_quotes,
+    select_representative_texts,
+)
+
+
+class TestTopicSampling(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        center = rng.standard_normal(32)
+        self.core = [center + 0.8 * rng.standard_normal(32) for _ in range(200)]
+        self.duplicates = [self.core[0] + 1e-4 * rng.standard_normal(32) for _ in range(50)]
+        self.outliers = [rng.standard_normal(32) * 3 for _ in range(3)]
+        self.embeddings = np.array(self.core + self.duplicates + self.outliers)
+        self.texts = (
+            [f"core feedback number {i}" for i in range(200)]
+            + ["core feedback number 0"] * 50
+            + [f"unusual complaint {i}" for i in range(3)]
+        )
+
+    def test_sample_respects_token_budget(self):
+        sample = select_representative_texts(self.texts, self.embeddings, token_budget=120)
+
+        self.assertLessEqual(estimate_prompt_tokens(sample), 120)
+        self.assertLess(len(sample), len(self.texts))
+
+    def test_starts_with_central_texts_and_keeps_outliers(self):
+        sample = select_representative_texts(self.texts, self.embeddings, token_budget=120, outlier_share=0.3)
+
+        self.assertTrue(sample[0].startswith("core"))
+        self.assertTrue(any(text.startswith("unusual") for text in sample))
+
+    def test_near_duplicates_are_collapsed(self):
+        sample = select_representative_texts(self.texts, self.embeddings, token_budget=100000)
+
+        self.assertEqual(sample.count("core feedback number 0"), 1)
+        self.assertEqual(len(sample), 203)
+
+    def test_without_embeddings_falls_back_to_unique_texts(self):
+        sample = select_representative_texts(["a", "b", "a", "c"], None, token_budget=2)
+        self.assertEqual(sample, ["a", "b"])
+
+
+class TestRepresentativeQuotes(unittest.TestCase):
+    def test_quotes_are_distinct_texts_closest_to_centroid(self):
+        embeddings = np.array(
+            [[1.0, 0.6, 0.0], [1.0, -0.6, 0.0], [1.0, -0.6, 0.0], [1.0, 0.0, 0.6], [-1.0, 0.0, 0.0]]
+        )
+        texts = ["a", "b", "b copy", "c", "outlier"]
+
+        quotes = select_representative_quotes(texts, embeddings, k=3)
+
+        self.assertEqual(quotes, ["b", "c", "a"])
+
+    def test_without_embeddings_returns_first_unique_texts(self):
+        self.assertEqual(select_representative_quotes(["a", "a", "b", "c", "d"], None, k=3), ["a", "b", "c"])
+
+
+class TestPackTopicSamples(unittest.TestCase):
+    def test_topics_are_packed_in_order_under_budget(self):
+        samples = {"A": ["x" * 40], "B": ["y" * 40], "C": ["z" * 200], "D": ["w"]}
+
+        batches = pack_topic_samples(samples, token_budget=25)
+
+        self.assertEqual([list(batch) for batch in batches], [["A", "B"], ["C"], ["D"]])
+
+
+if __name__ == "__main__":
+    unittest.main()